@@ -0,0 +1,7 @@
+"""
+Benchmarks for the visual foraging runtime.
+
+Run a benchmark from the repository root, e.g.::
+
+    python -m benchmarks.bench_spatial_index
+"""
@@ -0,0 +1,82 @@
+"""
+Full scene redraw with the per-element blit loop of FullRenderer against a
+single Surface.blits() batch from a sprite atlas (AtlasRenderer), for
+images with per-pixel alpha and for colorkeyed images, as loaded from GIFs
+or palette PNGs. Both must produce the same pixels. Runs headless with the SDL dummy video driver.
+"""
+
+import os
+import timeit
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.element_store import ElementStore
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.render_helpers import FullRenderer, AtlasRenderer
+
+WIDTH, HEIGHT = 1024, 768
+SIZES = [100, 1000, 10000]
+# Number of image types and whether they are colorkeyed
+CASES = [(2, False), (50, False), (2, True)]
+SPRITE_SIZE = 24
+
+
+def make_images(n_types, rng, colorkey=False):
+    images = []
+    for _ in range(n_types):
+        if colorkey:
+            img = pygame.Surface((SPRITE_SIZE, SPRITE_SIZE))
+            img.fill((0, 255, 0))
+        else:
+            img = pygame.Surface((SPRITE_SIZE, SPRITE_SIZE), pygame.SRCALPHA)
+        pygame.draw.circle(img, [int(c) for c in rng.integers(0, 256, 4)],
+                           (SPRITE_SIZE // 2, SPRITE_SIZE // 2),
+                           SPRITE_SIZE // 2)
+        if colorkey:
+            img.set_colorkey((0, 255, 0))
+            images.append(img.convert())
+        else:
+            images.append(img.convert_alpha())
+    return images
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    background = pygame.Surface((WIDTH, HEIGHT)).convert()
+    background.fill(pygame.Color('gray'))
+    rng = np.random.default_rng(0)
+    print(f"{'n':>6} {'types':>6} {'images':>9} {'blit loop (ms)':>15} "
+          f"{'atlas (ms)':>11} {'speed-up':>9}")
+    for n_types, colorkey in CASES:
+        images = make_images(n_types, rng, colorkey)
+        for n in SIZES:
+            store = ElementStore(
+                rng.uniform(0, WIDTH, n), rng.uniform(0, HEIGHT, n),
+                np.zeros(n), {'image': rng.integers(0, n_types, n)},
+                {'image': list(range(n_types))})
+            loop = FullRenderer(screen, background, images, store)
+            atlas = AtlasRenderer(screen, background, images, store)
+            # Some elements have vanished already
+            for i in rng.choice(n, n // 4, replace=False):
+                store.remove(i)
+                atlas.vanish(i)
+
+            loop.draw_scene()
+            expected = pygame.surfarray.array3d(screen)
+            atlas.draw_scene()
+            assert (pygame.surfarray.array3d(screen) == expected).all()
+
+            number = max(3, 3000 // n)
+            t_loop = timeit.timeit(loop.draw_scene, number=number) / number
+            t_atlas = timeit.timeit(atlas.draw_scene, number=number) / number
+            print(f"{n:>6} {n_types:>6} "
+                  f"{'colorkey' if colorkey else 'alpha':>9} "
+                  f"{t_loop * 1e3:>15.2f} "
+                  f"{t_atlas * 1e3:>11.2f} {t_loop / t_atlas:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
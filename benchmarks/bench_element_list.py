@@ -0,0 +1,153 @@
+"""
+Load, edit and serialize times of the element list editor, for the
+model/view ElementList against the previous QTableWidget version with one
+item per cell that is read back cell by cell.
+
+Load is setText() plus the first paint of the shown widget. Edit is
+N_EDITS single-cell edits, each followed by what the widget does on an
+edit: the QTableWidget version serialized the whole table, ElementList
+only marks the row. Serialize is text() of the freshly loaded table for
+both, and for ElementList also text() after the edits, which re-encodes
+only the edited rows. Both must produce the same elements.
+
+Runs offscreen and needs qtpy with a Qt binding:
+
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_element_list
+"""
+
+import os
+import random
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from qtpy import QtWidgets
+
+from benchmarks import opensesame_stubs
+
+opensesame_stubs.install()
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.element_list import ElementList
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.element_model import ElementModel
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.serialization_helpers import serialize_elements, deserialize_elements
+
+SIZES = [10, 1000, 10000]
+N_EDITS = 100
+FIELDS = ['image', 'type', 'role', 'value', 'click_sound', 'click_action',
+          'click_result', 'amount']
+
+
+def random_element(rng, i):
+    return {
+        'image': 'image_%d.png' % rng.randrange(50),
+        'type': 'type %d' % i,
+        'role': rng.choice(['target', 'distractor']),
+        'value': rng.randrange(10),
+        'click_sound': rng.choice(['', 'click.wav']),
+        'click_action': rng.choice(['click', 'double click', 'mouse over']),
+        'click_result': rng.choice(['vanish', 'remain']),
+        'amount': rng.randrange(1, 20),
+    }
+
+
+class TableWidgetList(QtWidgets.QTableWidget):
+    """The previous element list: a QTableWidget read back cell by cell."""
+
+    def __init__(self):
+        super().__init__()
+        self.setColumnCount(len(FIELDS) + 1)
+
+    def text(self):
+        elements = []
+        for row in range(self.rowCount()):
+            element = {f: self.item(row, col + 1).text()
+                       for col, f in enumerate(FIELDS)}
+            element['value'] = int(element['value'] or 0)
+            element['amount'] = int(element['amount'] or 0)
+            elements.append(element)
+        return serialize_elements(elements)
+
+    def setText(self, text):
+        self.blockSignals(True)
+        self.setRowCount(0)
+        for d in deserialize_elements(text):
+            row = self.rowCount()
+            self.insertRow(row)
+            self.setItem(row, 0, QtWidgets.QTableWidgetItem())
+            for col, f in enumerate(FIELDS):
+                self.setItem(row, col + 1,
+                             QtWidgets.QTableWidgetItem(str(d.get(f, ''))))
+        self.blockSignals(False)
+
+    def edit_cell(self, row, col, value):
+        self.item(row, col).setText(str(value))
+        self.text()
+
+
+def timed(f, *args):
+    t0 = time.perf_counter()
+    result = f(*args)
+    return (time.perf_counter() - t0) * 1000, result
+
+
+def edits(rng, n):
+    result = []
+    for _ in range(N_EDITS):
+        field = rng.choice(['type', 'role', 'value', 'amount'])
+        value = {'type': 'edited %d' % rng.randrange(1000),
+                 'role': rng.choice(['target', 'distractor']),
+                 'value': rng.randrange(10),
+                 'amount': rng.randrange(1, 20)}[field]
+        result.append((rng.randrange(n), field, value))
+    return result
+
+
+def main():
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    rng = random.Random(0)
+    print(f"{'rows':>6} {'widget':>12} {'load (ms)':>10} {'edit (ms)':>10} "
+          f"{'serialize (ms)':>15} {'after edit (ms)':>16}")
+    for n in SIZES:
+        text = serialize_elements([random_element(rng, i) for i in range(n)])
+        changes = edits(rng, n)
+
+        # QTableWidget with one item per cell
+        old = TableWidgetList()
+        old.show()
+        t_load, _ = timed(lambda: (old.setText(text), app.processEvents()))
+        t_serialize, old_text = timed(old.text)
+        n_edits = min(N_EDITS, max(1, 20000 // n))
+        t_edit, _ = timed(lambda: [
+            old.edit_cell(row, FIELDS.index(field) + 1, value)
+            for row, field, value in changes[:n_edits]])
+        # Long tables are edited fewer times, scaled up to N_EDITS
+        t_edit *= N_EDITS / n_edits
+        print(f"{n:>6} {'QTableWidget':>12} {t_load:>10.1f} {t_edit:>10.1f} "
+              f"{t_serialize:>15.1f} {'':>16}")
+        old.close()
+        old.deleteLater()
+
+        # ElementList over ElementModel
+        new = ElementList()
+        new.show()
+        t_load, _ = timed(lambda: (new.setText(text), app.processEvents()))
+        t_serialize, new_text = timed(new.text)
+        assert deserialize_elements(new_text) == deserialize_elements(old_text)
+        model = new.model
+        t_edit, _ = timed(lambda: [
+            model.setData(model.index(row, ElementModel.column(field)), value)
+            for row, field, value in changes])
+        t_after, edited = timed(new.text)
+        expected = deserialize_elements(text)
+        for row, field, value in changes:
+            expected[row][field] = value
+        assert deserialize_elements(edited) == expected
+        print(f"{n:>6} {'ElementList':>12} {t_load:>10.1f} {t_edit:>10.1f} "
+              f"{t_serialize:>15.1f} {t_after:>16.1f}")
+        new.close()
+        new.deleteLater()
+        app.processEvents()
+
+
+if __name__ == '__main__':
+    main()
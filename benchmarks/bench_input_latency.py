@@ -0,0 +1,85 @@
+"""
+Measure the end-to-end latency of the input path with synthetic clicks.
+
+A background thread posts clicks with pygame.event.post at random moments
+while a frame-paced loop like VisualForaging.run() polls the EventPump and
+hit-tests every click against a SpatialIndex, and waits for the next frame
+with EventPump.wait(). The stamp error is the time from posting a click to
+its timestamp; the latency is the time from posting it to the end of its
+hit test, which includes waiting for the next frame. Runs headless with
+the SDL dummy video driver.
+"""
+
+import os
+import random
+import threading
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging import timing_helpers
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.input_helpers import EventPump, DOWN
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.spatial_helpers import SpatialIndex
+
+WIDTH, HEIGHT = 1024, 768
+N_ELEMENTS = 1000
+N_CLICKS = 300
+FRAME_RATES = [60, 120, 240, 1000]
+
+
+def post_clicks(frame_rate, posted, rng):
+    for _ in range(N_CLICKS):
+        # Clicks arrive at random phases of the frame
+        time.sleep(rng.uniform(0.5, 1.5) / frame_rate)
+        pos = (rng.randrange(WIDTH), rng.randrange(HEIGHT))
+        posted.append(timing_helpers.now())
+        pygame.event.post(pygame.event.Event(
+            pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+
+
+def measure(frame_rate, index, rng):
+    pump = EventPump()
+    interval = 1 / frame_rate
+    pygame.event.clear()
+    posted = []
+    stamp_errors = []
+    latencies = []
+    poster = threading.Thread(target=post_clicks,
+                              args=(frame_rate, posted, rng))
+    poster.start()
+    while len(latencies) < N_CLICKS:
+        frame_start = timing_helpers.now()
+        for event in pump.poll():
+            if event.kind == DOWN:
+                index.nearest(event.x, event.y, 32)
+                t = posted[len(latencies)]
+                stamp_errors.append(event.time - t)
+                latencies.append(timing_helpers.now() - t)
+        pump.wait(frame_start + interval)
+    poster.join()
+    return np.array(stamp_errors) * 1000, np.array(latencies) * 1000
+
+
+def main():
+    pygame.display.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    rng = random.Random(0)
+    index = SpatialIndex(np.random.randint(0, WIDTH, N_ELEMENTS),
+                         np.random.randint(0, HEIGHT, N_ELEMENTS), 32)
+    print(f"{'':>10} {'stamp error (ms)':>27}   {'latency (ms)':>27}")
+    print(f"{'frame rate':>10} {'median':>8} {'p95':>8} {'max':>8}   "
+          f"{'median':>8} {'p95':>8} {'max':>8}")
+    for frame_rate in FRAME_RATES:
+        errors, latency = measure(frame_rate, index, rng)
+        print(f"{frame_rate:>10} "
+              f"{np.median(errors):>8.2f} {np.percentile(errors, 95):>8.2f} "
+              f"{errors.max():>8.2f}   "
+              f"{np.median(latency):>8.2f} {np.percentile(latency, 95):>8.2f} "
+              f"{latency.max():>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
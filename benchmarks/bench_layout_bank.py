@@ -0,0 +1,52 @@
+"""
+Scaling of layout bank generation with the number of worker processes.
+Also checks that the bank is bit-identical for every worker count.
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.layout_bank import build_layout_bank
+
+ELEMENTS = [
+    {'image': 'target.png', 'type': 'target', 'role': 'target', 'value': 1,
+     'amount': 1000},
+    {'image': 'distractor.png', 'type': 'distractor', 'role': 'distractor',
+     'value': 0, 'amount': 1000},
+]
+LOCATION_SETTINGS = '<mode: poisson, spacing: 1.0>'
+WIDTH, HEIGHT = 1920, 1080
+SPRITE_SIZE = 20
+N_TRIALS = 48
+
+
+def digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def main():
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+    digests = set()
+    baseline = None
+    print(f"{'workers':>7} {'time (s)':>9} {'trials/s':>9} {'speed-up':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'layouts.npy')
+        for workers in worker_counts:
+            t = time.perf_counter()
+            build_layout_bank(path, ELEMENTS, LOCATION_SETTINGS, WIDTH,
+                              HEIGHT, SPRITE_SIZE, seed=1,
+                              n_trials=N_TRIALS, workers=workers)
+            t = time.perf_counter() - t
+            baseline = baseline or t
+            digests.add(digest(path))
+            print(f"{workers:>7} {t:>9.2f} {N_TRIALS / t:>9.1f} "
+                  f"{baseline / t:>8.1f}x")
+    assert len(digests) == 1, "Bank depends on the number of workers"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Time the poisson location mode at densities of up to tens of thousands of
+elements and check that the minimum distance holds.
+"""
+
+import timeit
+
+import numpy as np
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.layout_helpers import generate_positions, make_rng, LayoutError
+
+WIDTH, HEIGHT = 1920, 1080
+SPACING = 1.0
+# (elements, sprite size in px)
+CASES = [(1000, 32), (5000, 14), (10000, 10), (20000, 7), (50000, 4)]
+
+
+def min_distance(points):
+    """Smallest distance between two points, by sweeping along x."""
+    points = points[np.argsort(points[:, 0])]
+    best = np.inf
+    for offset in range(1, len(points)):
+        d = points[offset:] - points[:-offset]
+        if d[:, 0].min() >= best:
+            break
+        best = min(best, np.hypot(d[:, 0], d[:, 1]).min())
+    return best
+
+
+def main():
+    settings = {'mode': 'poisson', 'spacing': SPACING}
+    print(f"{'n':>6} {'sprite':>6} {'time (ms)':>10} {'min dist':>9}")
+    for n, sprite_size in CASES:
+        rng = make_rng(0)
+        points = generate_positions(settings, n, WIDTH, HEIGHT, rng,
+                                    sprite_size)
+        assert min_distance(points) >= SPACING * sprite_size
+        t = timeit.timeit(
+            lambda: generate_positions(settings, n, WIDTH, HEIGHT, rng,
+                                       sprite_size), number=3) / 3
+        print(f"{n:>6} {sprite_size:>6} {t * 1000:>10.1f} "
+              f"{min_distance(points):>9.2f}")
+
+    try:
+        generate_positions(settings, 100000, WIDTH, HEIGHT, make_rng(0), 8)
+    except LayoutError as e:
+        print(f"Overfull display fails as expected: {e}")
+
+
+if __name__ == '__main__':
+    main()
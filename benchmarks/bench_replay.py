@@ -0,0 +1,103 @@
+"""
+Speed and fidelity of replaying recorded sessions.
+
+Records N_TRIALS trials headless (see bench_runtime): all clicks of a trial
+are posted before run(), and the event logs are saved to a temporary
+folder. The session is then replayed as fast as possible through
+check_clicked(), and every replayed outcome must match the recording.
+
+    python -m benchmarks.bench_replay
+"""
+
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from benchmarks import opensesame_stubs
+from benchmarks.bench_runtime import make_pool, elements
+
+opensesame_stubs.install()
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging import event_log
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.visual_foraging import VisualForaging
+
+WIDTH, HEIGHT = 1024, 768
+N_TRIALS = 1000
+N_ELEMENTS = 100
+# Grid cells are larger than the click radius, so every click collects
+# the element it aims at and every recorded trial ends
+LOCATION_SETTINGS = '<mode: grid, rows: 10, cols: 10, jitter_x: 0, jitter_y: 0>'
+
+
+def make_item(pool, folder, replay):
+    experiment = opensesame_stubs.Experiment(
+        pool, width=WIDTH, height=HEIGHT, fullscreen='no',
+        background='black')
+    item = VisualForaging('visual_foraging', experiment)
+    item.var.elements = elements(N_ELEMENTS)
+    item.var.location_settings = LOCATION_SETTINGS
+    item.var.frame_rate = 100000
+    item.var.layout_seed = 1
+    if replay:
+        item.var.replay_folder = folder
+    else:
+        item.var.event_log_folder = folder
+    return item
+
+
+def record(item, rng):
+    for trial in range(N_TRIALS):
+        item.var.set('count_%s' % item.name, trial)
+        item.prepare()
+        store = item.element_instances
+        ids = list(store.live_ids())
+        rng.shuffle(ids)
+        for i in ids:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEBUTTONDOWN,
+                pos=(int(store.x[i]), int(store.y[i])), button=1))
+        item.run()
+        pygame.event.clear()
+    event_log.flush()
+
+
+def replay(item):
+    mismatches = 0
+    for trial in range(N_TRIALS):
+        item.var.set('count_%s' % item.name, trial)
+        item.prepare()
+        item.run()
+        mismatches += item.experiment.var.replay_mismatches
+    return mismatches
+
+
+def main():
+    pygame.init()
+    with tempfile.TemporaryDirectory() as folder:
+        pool = make_pool(folder, 16)
+        logs = os.path.join(folder, 'logs')
+
+        t0 = time.perf_counter()
+        record(make_item(pool, logs, replay=False), random.Random(0))
+        record_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        mismatches = replay(make_item(pool, logs, replay=True))
+        replay_time = time.perf_counter() - t0
+
+    print(f"{N_TRIALS} trials, {N_ELEMENTS} elements")
+    print(f"record: {record_time:.1f} s")
+    print(f"replay: {replay_time:.1f} s "
+          f"({N_TRIALS / replay_time:.0f} trials/s), "
+          f"{mismatches} mismatches")
+    assert mismatches == 0
+
+
+if __name__ == '__main__':
+    main()
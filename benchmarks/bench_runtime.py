@@ -0,0 +1,198 @@
+"""
+Throughput of VisualForaging.prepare() and run(), headless.
+
+The item runs with the SDL dummy video driver and a stubbed OpenSesame
+experiment (see opensesame_stubs). A background thread clicks every element
+once, in random order, by posting MOUSEBUTTONDOWN events with
+pygame.event.post, spread over about N_FRAMES frames. The sweep covers
+element counts, sprite sizes and layout modes and reports prepare time,
+frames/s, clicks processed/s and memory: the peak of Python allocations
+during prepare and the peak resident set size of the process.
+
+tracemalloc slows down allocation-heavy code severalfold, so the peak is
+measured in a separate prepare() of a fresh item; prepare time and the run
+are measured without it. Both passes start with empty image and element
+caches, like the first trial of an experiment. With --json, the results
+are also written to a file for regression tracking.
+
+    python -m benchmarks.bench_runtime [--render-mode "dirty rectangles"]
+        [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import tempfile
+import threading
+import time
+import tracemalloc
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import pygame
+
+from benchmarks import opensesame_stubs
+
+opensesame_stubs.install()
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.element_schema import compile_elements
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.image_cache import image_cache
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.layout_helpers import LayoutError
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.serialization_helpers import parse_elements
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.visual_foraging import VisualForaging
+
+WIDTH, HEIGHT = 1024, 768
+ELEMENT_COUNTS = [100, 1000, 5000]
+SPRITE_SIZES = [16, 48]
+LAYOUTS = {
+    'uniform': '',
+    'grid': '<mode: grid, rows: 50, cols: 100, jitter_x: 0, jitter_y: 0>',
+    'scatter': '<mode: scatter>',
+    'poisson': '<mode: poisson, spacing: 0.5>',
+}
+N_FRAMES = 100
+
+
+def make_pool(folder, sprite_size):
+    pool = {}
+    for name, color in (('target.png', 'red'), ('distractor.png', 'blue')):
+        surface = pygame.Surface((sprite_size, sprite_size))
+        surface.fill(pygame.Color(color))
+        path = os.path.join(folder, '%d_%s' % (sprite_size, name))
+        pygame.image.save(surface, path)
+        pool[name] = path
+    return pool
+
+
+def elements(n):
+    return '\n'.join([
+        '<"image": "target.png", "type": "target", "role": "target", '
+        '"value": 1, "amount": %d>' % (n // 2),
+        '<"image": "distractor.png", "type": "distractor", '
+        '"role": "distractor", "value": 0, "amount": %d>' % (n - n // 2),
+    ])
+
+
+def post_clicks(store, done, seed=0):
+    """
+    Click the live elements in random order, in batches of
+    clicks_per_frame, until the trial is done. A click may collect an
+    overlapping element instead, so elements that are left get clicked
+    again in the next round.
+    """
+    rng = random.Random(seed)
+    clicks_per_frame = max(1, store.size // N_FRAMES)
+    while not done.is_set():
+        ids = list(store.live_ids())
+        rng.shuffle(ids)
+        for start in range(0, len(ids), clicks_per_frame):
+            # Wait until the item has taken the previous batch from the queue
+            while pygame.event.peek(pygame.MOUSEBUTTONDOWN, pump=False):
+                if done.is_set():
+                    return
+                time.sleep(0.0001)
+            for i in ids[start:start + clicks_per_frame]:
+                pygame.event.post(pygame.event.Event(
+                    pygame.MOUSEBUTTONDOWN,
+                    pos=(int(store.x[i]), int(store.y[i])), button=1))
+
+
+def make_item(pool, n, location_settings, render_mode):
+    """Return a fresh item, with the caches shared by all items cleared."""
+    experiment = opensesame_stubs.Experiment(
+        pool, width=WIDTH, height=HEIGHT, fullscreen='no',
+        background='black')
+    item = VisualForaging('visual_foraging', experiment)
+    item.var.elements = elements(n)
+    item.var.location_settings = location_settings
+    item.var.render_mode = render_mode
+    # Unthrottled, so the frame rate measures the work per frame
+    item.var.frame_rate = 100000
+    item.var.layout_seed = 1
+    image_cache.clear()
+    compile_elements.cache_clear()
+    parse_elements.cache_clear()
+    return item
+
+
+def run_case(pool, n, location_settings, render_mode):
+    # Memory pass
+    item = make_item(pool, n, location_settings, render_mode)
+    tracemalloc.start()
+    item.prepare()
+    prepare_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Timing pass
+    item = make_item(pool, n, location_settings, render_mode)
+    experiment = item.experiment
+    t0 = time.perf_counter()
+    item.prepare()
+    prepare_time = time.perf_counter() - t0
+
+    done = threading.Event()
+    poster = threading.Thread(target=post_clicks,
+                              args=(item.element_instances, done))
+    poster.start()
+    t0 = time.perf_counter()
+    item.run()
+    run_time = time.perf_counter() - t0
+    done.set()
+    poster.join()
+    pygame.event.clear()
+
+    var = experiment.var
+    return {
+        'prepare_ms': prepare_time * 1000,
+        'fps': var.frame_count / run_time,
+        'clicks_s': var.n_clicks / run_time,
+        'prepare_peak_mb': prepare_peak / 2 ** 20,
+        'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        / 2 ** 10,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--render-mode', default='full redraw')
+    parser.add_argument('--json', metavar='PATH',
+                        help='also write the results to this JSON file')
+    args = parser.parse_args()
+    results = []
+
+    pygame.init()
+    print(f"render mode: {args.render_mode}")
+    print(f"{'layout':>8} {'n':>6} {'sprite':>6} {'prepare (ms)':>12} "
+          f"{'frames/s':>9} {'clicks/s':>9} {'prepare peak (MB)':>17} "
+          f"{'max RSS (MB)':>12}")
+    with tempfile.TemporaryDirectory() as folder:
+        for sprite_size in SPRITE_SIZES:
+            pool = make_pool(folder, sprite_size)
+            for layout, location_settings in LAYOUTS.items():
+                for n in ELEMENT_COUNTS:
+                    case = dict(render_mode=args.render_mode, layout=layout,
+                                n=n, sprite_size=sprite_size)
+                    try:
+                        r = run_case(pool, n, location_settings,
+                                     args.render_mode)
+                    except LayoutError as e:
+                        print(f"{layout:>8} {n:>6} {sprite_size:>6}  "
+                              f"skipped: {e}")
+                        results.append(dict(case, skipped=str(e)))
+                        continue
+                    print(f"{layout:>8} {n:>6} {sprite_size:>6} "
+                          f"{r['prepare_ms']:>12.1f} {r['fps']:>9.0f} "
+                          f"{r['clicks_s']:>9.0f} "
+                          f"{r['prepare_peak_mb']:>17.2f} "
+                          f"{r['max_rss_mb']:>12.0f}")
+                    results.append(dict(case, **r))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare the angle-brace parser with the previous replace + json.loads path
+on item scripts with thousands of element lines.
+
+random_element() generates the elements of the round-trip test in
+tests/test_serialization.py.
+"""
+
+import json
+import timeit
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging import serialization_helpers
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.serialization_helpers import serialize_elements, deserialize_elements
+
+ALPHABET = 'abc <>{}"\\/:,äß\t'
+SIZES = [100, 1000, 5000]
+
+
+def random_string(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randrange(12)))
+
+
+def random_element(rng):
+    return {
+        'image': random_string(rng) + '.png',
+        'type': random_string(rng),
+        'role': rng.choice(['target', 'distractor']),
+        'value': rng.randrange(-10, 10),
+        'click_sound': random_string(rng),
+        'click_action': rng.choice(['click', 'double click', 'mouse over']),
+        'click_result': rng.choice(['vanish', 'remain']),
+        'amount': rng.randrange(100),
+    }
+
+
+def old_deserialize(text):
+    """The replace + json.loads parser this module used before."""
+    result = []
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    for line in lines:
+        j = line.replace("<", "{").replace(">", "}")
+        result.append(json.loads(j))
+    return result
+
+
+def main():
+    print(f"{'lines':>6} {'old (ms)':>9} {'new (ms)':>9} {'cached (us)':>12}")
+    for n in SIZES:
+        # Strings without braces, which the old parser cannot handle
+        text = serialize_elements([
+            {'image': f'item_{i}.png', 'type': f'item {i}', 'role': 'target',
+             'value': i, 'click_sound': '', 'click_action': 'click',
+             'click_result': 'vanish', 'amount': 3} for i in range(n)])
+        old = timeit.timeit(lambda: old_deserialize(text), number=5) / 5
+
+        def uncached():
+            serialization_helpers.parse_elements.cache_clear()
+            deserialize_elements(text)
+        new = timeit.timeit(uncached, number=5) / 5
+        deserialize_elements(text)
+        cached = timeit.timeit(lambda: deserialize_elements(text),
+                               number=20) / 20
+        print(f"{n:>6} {old * 1e3:>9.2f} {new * 1e3:>9.2f} "
+              f"{cached * 1e6:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Compare click hit-testing through the SpatialIndex with the linear scan that
+VisualForaging.check_clicked used before.
+"""
+
+import random
+import timeit
+
+from numpy import array
+from numpy.linalg import norm
+
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.spatial_helpers import SpatialIndex
+
+WIDTH, HEIGHT = 1920, 1080
+CLICK_RADIUS = 32
+SIZES = [100, 1000, 10000, 100000]
+
+
+def linear_nearest(instances, click_pos, radius):
+    """The pre-index check_clicked search, without the removal."""
+    for ei in instances:
+        element_pos = array([ei['x'], ei['y']])
+        ei['dist_to_click'] = norm(element_pos - array(click_pos))
+    closest_element = instances[0]
+    for ei in instances:
+        if ei['dist_to_click'] < closest_element['dist_to_click']:
+            closest_element = ei
+    if closest_element['dist_to_click'] > radius:
+        return None
+    return closest_element
+
+
+def main():
+    rng = random.Random(0)
+    print(f"{'n':>8} {'linear (ms)':>12} {'build (ms)':>11} "
+          f"{'index (us)':>11} {'speed-up':>9}")
+    for n in SIZES:
+        instances = [{'x': rng.randint(0, WIDTH), 'y': rng.randint(0, HEIGHT)}
+                     for _ in range(n)]
+        clicks = [(rng.randint(0, WIDTH), rng.randint(0, HEIGHT))
+                  for _ in range(200)]
+        index = SpatialIndex([ei['x'] for ei in instances],
+                             [ei['y'] for ei in instances], CLICK_RADIUS)
+
+        # Both searches must agree on the element that would be hit
+        for click in clicks[:20]:
+            i = index.nearest(click[0], click[1], CLICK_RADIUS)
+            expected = linear_nearest(instances, click, CLICK_RADIUS)
+            assert (None if i is None else instances[i]) is expected
+
+        linear_clicks = clicks[:max(1, 20000 // n)]
+        linear = timeit.timeit(
+            lambda: [linear_nearest(instances, c, CLICK_RADIUS)
+                     for c in linear_clicks], number=1) / len(linear_clicks)
+        build = timeit.timeit(
+            lambda: SpatialIndex([ei['x'] for ei in instances],
+                                 [ei['y'] for ei in instances],
+                                 CLICK_RADIUS), number=1)
+        indexed = timeit.timeit(
+            lambda: [index.nearest(c[0], c[1], CLICK_RADIUS) for c in clicks],
+            number=5) / (5 * len(clicks))
+        print(f"{n:>8} {linear * 1e3:>12.3f} {build * 1e3:>11.3f} "
+              f"{indexed * 1e6:>11.1f} {linear / indexed:>8.0f}x")
+
+
+if __name__ == '__main__':
+    main()
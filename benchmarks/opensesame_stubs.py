@@ -0,0 +1,137 @@
+"""
+Minimal stand-ins for OpenSesame, so that the VisualForaging item can be
+prepared and run headless, outside of an experiment.
+
+Call install() before importing the item. Modules that are actually
+installed are left alone; only the missing ones are replaced by stubs.
+"""
+
+import importlib
+import sys
+import time
+import types
+
+
+class _Anything:
+    """Accepts any call or attribute access. Used for the Qt classes."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __call__(self, *args, **kwargs):
+        return _Anything()
+
+    def __getattr__(self, name):
+        return _Anything()
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__dict__.update(attrs)
+
+    def __getattr__(attr):
+        # Everything not defined explicitly is a class that accepts anything
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return _Anything
+
+    module.__getattr__ = __getattr__
+    return module
+
+
+class Var:
+    """OpenSesame's var store: attribute access plus get() and set()."""
+
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+    def get(self, name, default=None):
+        return self.__dict__.get(name, default)
+
+    def set(self, name, value):
+        self.__dict__[name] = value
+
+
+class Pool(dict):
+    """The file pool maps file names to paths."""
+
+
+class Clock:
+
+    def time(self):
+        return time.perf_counter() * 1000
+
+
+class Experiment:
+    """
+    Experiment with a file pool and global variables.
+
+    Parameters
+    ----------
+    pool : dict
+        Maps pool file names to paths.
+    **variables
+        Experiment variables, e.g. width and height.
+    """
+
+    def __init__(self, pool=None, **variables):
+        self.pool = Pool(pool or {})
+        self.var = Var(**variables)
+        self.experiment_path = ''
+
+
+class Item:
+    """
+    The parts of libopensesame.item.Item that VisualForaging uses. Item
+    variables fall back to the experiment variables.
+    """
+
+    def __init__(self, name, experiment, script=None):
+        self.name = name
+        self.experiment = experiment
+        self.var = Var(**vars(experiment.var))
+        self.clock = Clock()
+        self.reset()
+
+    def reset(self):
+        pass
+
+    def prepare(self):
+        pass
+
+    def run(self):
+        pass
+
+
+def _missing(name):
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        return True
+    return False
+
+
+def install():
+    """Register stubs for the OpenSesame and Qt modules that are missing."""
+    stubs = {
+        'libopensesame': _module('libopensesame'),
+        'libopensesame.py3compat': _module('libopensesame.py3compat'),
+        'libopensesame.item': _module('libopensesame.item', Item=Item),
+        'libqtopensesame': _module('libqtopensesame'),
+        'libqtopensesame.items': _module('libqtopensesame.items'),
+        'libqtopensesame.items.qtautoplugin':
+            _module('libqtopensesame.items.qtautoplugin'),
+        'libqtopensesame.widgets': _module('libqtopensesame.widgets'),
+        'libqtopensesame.widgets.pool_widget':
+            _module('libqtopensesame.widgets.pool_widget'),
+        'openexp': _module('openexp'),
+        'openexp.canvas': _module('openexp.canvas'),
+        'qtpy': _module('qtpy', QtGui=_module('qtpy.QtGui'),
+                        QtCore=_module('qtpy.QtCore'),
+                        QtWidgets=_module('qtpy.QtWidgets')),
+    }
+    # py3compat only re-exports builtins
+    stubs['libopensesame.py3compat'].__all__ = []
+    for name, module in stubs.items():
+        if name not in sys.modules and _missing(name):
+            sys.modules[name] = module
@@ -1,5 +1,7 @@
 """A docstring with a description of the plugin"""
 
+from .render_helpers import RENDER_MODES
+
 # The category determines the group for the plugin in the item toolbar
 category = "Visual Stimuli"
 
@@ -12,5 +14,119 @@ controls = [
         "label": "Show Mousepointer",
         "name": "show_mouse_pointer_widget",
         "tooltip": "Whether the mousepointer will be visible"
+    },
+    {
+        "type": "line_edit",
+        "var": "stop_rule",
+        "label": "Stop rule",
+        "name": "stop_rule_widget",
+        "tooltip": "Python expression that ends the trial when true, e.g. "
+                   "'collected >= 10' or 'value_sum >= 25'. Empty ends the "
+                   "trial when no targets are left."
+    },
+    {
+        "type": "combobox",
+        "var": "render_mode",
+        "label": "Rendering",
+        "options": list(RENDER_MODES),
+        "name": "render_mode_widget",
+        "tooltip": "Redraw the whole display on every frame, only the "
+                   "regions of vanished elements, or the whole display in "
+                   "one batch from an atlas of the element images"
+    },
+    {
+        "type": "spinbox",
+        "var": "image_cache_mb",
+        "label": "Image cache",
+        "min_val": 1,
+        "max_val": 4096,
+        "suffix": " MB",
+        "name": "image_cache_mb_widget",
+        "tooltip": "Memory budget for element images that are kept "
+                   "between trials"
+    },
+    {
+        "type": "spinbox",
+        "var": "frame_rate",
+        "label": "Frame rate",
+        "min_val": 1,
+        "max_val": 1000,
+        "suffix": " Hz",
+        "name": "frame_rate_widget",
+        "tooltip": "Target rate at which input is polled and the display "
+                   "is updated"
+    },
+    {
+        "type": "line_edit",
+        "var": "layout_seed",
+        "label": "Layout seed",
+        "name": "layout_seed_widget",
+        "tooltip": "Integer seed that makes the layout of every trial "
+                   "reproducible. Leave empty for random layouts."
+    },
+    {
+        "type": "line_edit",
+        "var": "layout_bank",
+        "label": "Layout bank",
+        "name": "layout_bank_widget",
+        "tooltip": "Precomputed layouts (.npy file in the file pool, with "
+                   "its .index.npz next to it). Leave empty to generate "
+                   "layouts during prepare."
+    },
+    {
+        "type": "line_edit",
+        "var": "event_log_folder",
+        "label": "Event log folder",
+        "name": "event_log_folder_widget",
+        "tooltip": "Folder in which the clicks of every trial are saved as "
+                   "<item>_<subject_nr>_<trial>.npz. A session with the "
+                   "same subject number overwrites the files of the "
+                   "earlier one. Leave empty to only log them as variables."
+    },
+    {
+        "type": "line_edit",
+        "var": "replay_folder",
+        "label": "Replay from folder",
+        "name": "replay_folder_widget",
+        "tooltip": "Event log folder of a recorded session. Every trial "
+                   "replays the clicks recorded for the current subject "
+                   "number on the recorded layout instead of waiting for the "
+                   "mouse, and logs the number of diverging outcomes as "
+                   "replay_mismatches."
+    },
+    {
+        "type": "checkbox",
+        "var": "replay_realtime",
+        "label": "Replay in real time",
+        "name": "replay_realtime_widget",
+        "tooltip": "Replay clicks at their recorded times. Otherwise trials "
+                   "are replayed as fast as possible."
+    },
+    {
+        "type": "checkbox",
+        "var": "profile",
+        "label": "Profile the frame loop",
+        "name": "profile_widget",
+        "tooltip": "Log percentiles of the time spent polling, hit-testing, "
+                   "drawing and flipping in every frame, dropped frames and "
+                   "input-to-photon latency as profile_* variables."
+    },
+    {
+        "type": "checkbox",
+        "var": "look_ahead",
+        "label": "Prepare next trial in the background",
+        "name": "look_ahead_widget",
+        "tooltip": "While a trial runs, parse the elements, decode the "
+                   "images and generate the layout of the next trial on a "
+                   "worker thread. Only used if the settings of the next "
+                   "trial turn out to be the same."
+    },
+    {
+        "type": "checkbox",
+        "var": "debug",
+        "label": "Print debug output",
+        "name": "debug_widget",
+        "tooltip": "Print clicks and settings to the debug window. Slows "
+                   "down the trial."
     }]
 
@@ -0,0 +1,76 @@
+"""
+Packing of element images into a single atlas surface.
+"""
+
+import math
+
+import pygame
+
+
+def pack_rects(sizes, max_width=None):
+    """
+    Pack rectangles into shelves, tallest first.
+
+    Args:
+        sizes (list of tuple): Width and height of every rectangle.
+        max_width (int): Width of the shelves. By default roughly the side
+            of a square with the total area of the rectangles.
+
+    Returns:
+        tuple: A list with a pygame.Rect per size, in the order of sizes,
+        and the (width, height) of the packed area.
+    """
+    if not sizes:
+        return [], (0, 0)
+    if max_width is None:
+        area = sum(w * h for w, h in sizes)
+        max_width = max(max(w for w, h in sizes), int(math.sqrt(area)) + 1)
+    rects = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x + w > max_width:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        rects[i] = pygame.Rect(x, y, w, h)
+        x += w
+        width = max(width, x)
+        shelf_height = max(shelf_height, h)
+    return rects, (width, y + shelf_height)
+
+
+def build_atlas(images):
+    """
+    Copy images into one surface.
+
+    Args:
+        images (list of pygame.Surface): The images, e.g. the element images
+            indexed by the store's image codes.
+
+    Returns:
+        tuple: The atlas surface, with per-pixel alpha and in display format
+        if the display is set up, and a list with the pygame.Rect of every
+        image in the atlas.
+    """
+    rects, size = pack_rects([img.get_size() for img in images])
+    atlas = pygame.Surface((max(size[0], 1), max(size[1], 1)),
+                           pygame.SRCALPHA)
+    for img, rect in zip(images, rects):
+        if img.get_colorkey() is not None:
+            # Adding ignores the colorkey, so it is turned into alpha first
+            img = _colorkey_to_alpha(img)
+        # Adding onto the transparent atlas copies the pixels unblended
+        atlas.blit(img, rect, special_flags=pygame.BLEND_RGBA_ADD)
+    if pygame.display.get_surface() is not None:
+        atlas = atlas.convert_alpha()
+    return atlas, rects
+
+
+def _colorkey_to_alpha(img):
+    """Return a copy of a colorkeyed image with per-pixel alpha."""
+    if pygame.display.get_surface() is not None:
+        return img.convert_alpha()
+    # A plain blit onto a transparent surface leaves out the key color
+    copy = pygame.Surface(img.get_size(), pygame.SRCALPHA)
+    copy.blit(img, (0, 0))
+    return copy
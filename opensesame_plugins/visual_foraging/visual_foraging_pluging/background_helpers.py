@@ -0,0 +1,68 @@
+"""
+Static background layer composited from a color and an optional image.
+"""
+
+import os
+from collections import OrderedDict
+
+import pygame
+
+from .serialization_helpers import deserialize_element
+
+DEFAULT_COLOR = 'black'
+
+# Composited layers by screen size, color and image
+_layers = OrderedDict()
+LAYER_CACHE_SIZE = 4
+
+
+def parse_background(value):
+    """
+    Parse the background variable.
+
+    Args:
+        value (str): Either the angle-brace text written by
+            BackgroundSelector, e.g. '<"color": "#808080", "image": "bg.png">',
+            or a plain color.
+
+    Returns:
+        tuple: The color and the image file name, or None if there is no
+        image.
+    """
+    text = str(value or '').strip()
+    if text.startswith('<'):
+        data = deserialize_element(text)
+        return data.get('color') or DEFAULT_COLOR, data.get('image') or None
+    return text or DEFAULT_COLOR, None
+
+
+def background_layer(size, color, image_path=None):
+    """
+    Return the background of the screen as a display-format surface: the
+    color, with the image, if any, scaled to the screen on top.
+
+    Layers are cached by screen size, color and image (path and modification
+    time), so a full-screen image is loaded and scaled once, not once per
+    trial. The surface is shared and must not be drawn on. Needs the
+    display to be set up.
+    """
+    key = (tuple(size), str(color), image_path,
+           os.path.getmtime(image_path) if image_path else None)
+    layer = _layers.get(key)
+    if layer is not None:
+        _layers.move_to_end(key)
+        return layer
+
+    layer = pygame.Surface(size)
+    layer.fill(pygame.Color(color))
+    if image_path:
+        image = pygame.image.load(image_path).convert_alpha()
+        if image.get_size() != tuple(size):
+            image = pygame.transform.smoothscale(image, size)
+        layer.blit(image, (0, 0))
+    layer = layer.convert()
+
+    _layers[key] = layer
+    while len(_layers) > LAYER_CACHE_SIZE:
+        _layers.popitem(last=False)
+    return layer
@@ -1,7 +1,8 @@
 from qtpy import QtCore, QtWidgets, QtGui
 import json
 from libqtopensesame.widgets.pool_widget import select_from_pool
-from .serialization_helpers import serialize_elements, deserialize_elements
+from .serialization_helpers import serialize_elements, deserialize_element
+from .change_pipeline import ChangePipeline
 
 
 class BackgroundSelector(QtWidgets.QWidget):
@@ -67,6 +68,12 @@ class BackgroundSelector(QtWidgets.QWidget):
 
         h.addStretch()
 
+        # Changes reach the script once editing pauses
+        self.changes = ChangePipeline(lambda row: self.text(),
+                                      self.textChanged.emit, parent=self)
+        if self.plugin:
+            self.textChanged.connect(self.plugin.apply_edit_changes)
+
         # Connect events
         self.color_btn.clicked.connect(self.pick_color)
         self.image_btn.clicked.connect(self.pick_image)
@@ -81,22 +88,19 @@ class BackgroundSelector(QtWidgets.QWidget):
         if col.isValid():
             self._data["color"] = col.name()
             self.update_display()
-            if self.plugin:
-                self.plugin.apply_edit_changes()
+            self.changes.mark()
 
     def pick_image(self):
         fname = select_from_pool(self.main_window, parent=self)
         if fname:
             self._data["image"] = fname
             self.update_display()
-            if self.plugin:
-                self.plugin.apply_edit_changes()
+            self.changes.mark()
 
     def clear_image(self):
         self._data["image"] = None
         self.update_display()
-        if self.plugin:
-            self.plugin.apply_edit_changes()
+        self.changes.mark()
 
     # ------------------------------------------------------------------
     # Update UI
@@ -128,9 +132,10 @@ class BackgroundSelector(QtWidgets.QWidget):
         return serialize_elements(self._data)
 
     def setText(self, text):
+        self.changes.sync(text)
         try:
             #data = json.loads(text)
-            data = deserialize_elements(text)
+            data = deserialize_element(text)
             self._data = {
                 "color": data.get("color"),
                 "image": data.get("image")
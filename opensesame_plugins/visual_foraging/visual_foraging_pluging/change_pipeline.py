@@ -0,0 +1,82 @@
+"""
+Coalescing of edits in the editor widgets into single script updates.
+"""
+
+from qtpy import QtCore
+
+# Pause after the last edit before the script is updated (ms)
+DEBOUNCE_MS = 250
+
+
+class ChangePipeline(QtCore.QObject):
+    """
+    Collects the edits of an editor widget and reports the new text once
+    editing pauses.
+
+    The text of the widget is made up of rows, one line each, that are
+    encoded separately and kept. Edits only mark rows as dirty and restart
+    a single-shot timer; ``text()`` re-encodes just the dirty rows. When the
+    timer fires, ``on_change(text)`` is called, but only if the text differs
+    from the last one reported or set with ``sync()``. Widgets without rows
+    use a single row that holds their whole text.
+
+    Parameters
+    ----------
+    encode : callable
+        ``encode(row)`` returns the line of a row.
+    on_change : callable
+        Called with the new text.
+    rows : int
+        Initial number of rows.
+    delay : int
+        Debounce interval in ms.
+    """
+
+    def __init__(self, encode, on_change, rows=1, delay=DEBOUNCE_MS,
+                 parent=None):
+        super().__init__(parent)
+        self.encode = encode
+        self.on_change = on_change
+        self._lines = [None] * rows
+        self._last = None
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay)
+        self._timer.timeout.connect(self.flush)
+
+    def mark(self, row=0):
+        """Mark a row as edited."""
+        self._lines[row] = None
+        self._timer.start()
+
+    def insert(self, row):
+        """Mark a row as inserted before ``row``."""
+        self._lines.insert(row, None)
+        self._timer.start()
+
+    def remove(self, row):
+        """Mark a row as removed."""
+        del self._lines[row]
+        self._timer.start()
+
+    def reset(self, rows=1):
+        """Mark all rows as dirty after the widget was rebuilt."""
+        self._lines = [None] * rows
+
+    def sync(self, text):
+        """Record text as the text the script already holds."""
+        self._last = text
+
+    def text(self):
+        for row, line in enumerate(self._lines):
+            if line is None:
+                self._lines[row] = self.encode(row)
+        return "\n".join(self._lines)
+
+    def flush(self):
+        """Report pending changes right away."""
+        self._timer.stop()
+        text = self.text()
+        if text != self._last:
+            self._last = text
+            self.on_change(text)
@@ -0,0 +1,120 @@
+"""
+Running counters that decide when a foraging trial is complete.
+"""
+
+import numpy as np
+
+DEFAULT_STOP_RULE = 'targets_left == 0'
+
+# Builtins that stop rules may use. Everything else is unavailable.
+_RULE_BUILTINS = {'min': min, 'max': max, 'sum': sum, 'abs': abs,
+                  'all': all, 'any': any, 'len': len}
+
+
+class CompletionTracker:
+    """
+    Keeps per-role and per-type counts of remaining and collected elements.
+
+    The counts are computed once from the ElementStore and then updated by
+    ``collect()`` whenever an element vanishes, so checking for completion
+    never walks the element list.
+
+    A stop rule is a Python expression, like OpenSesame's run-if
+    conditions, that is evaluated against these names:
+
+    targets_left, distractors_left
+        Number of live targets and distractors.
+    collected, targets_collected, distractors_collected
+        Number of collected elements (all, targets, distractors).
+    value_sum
+        Summed value of the collected elements.
+    left, collected_by_type
+        Dicts mapping an element type to its live and collected counts.
+    only_left(*types)
+        True if every live element is of one of the given types.
+
+    Examples: ``collected >= 10``, ``value_sum >= 25`` or
+    ``targets_left == 0 and only_left('blue square')``.
+
+    Parameters
+    ----------
+    store : ElementStore
+        The element instances of the trial.
+    stop_rule : str
+        Stop rule expression. Empty means ``targets_left == 0``.
+    """
+
+    def __init__(self, store, stop_rule=''):
+        self.store = store
+        self.stop_rule = stop_rule.strip() or DEFAULT_STOP_RULE
+        self._code = compile(self.stop_rule, '<stop rule>', 'eval')
+
+        self._roles = self._column('role')
+        self._types = self._column('type')
+        self.left_by_role = self._count(self._roles)
+        self.left_by_type = self._count(self._types)
+        self.collected_by_role = dict.fromkeys(self.left_by_role, 0)
+        self.collected_by_type = dict.fromkeys(self.left_by_type, 0)
+        self.collected = 0
+        self.value_sum = 0
+
+        self._namespace = {
+            '__builtins__': _RULE_BUILTINS,
+            'left': self.left_by_type,
+            'collected_by_type': self.collected_by_type,
+            'only_left': self.only_left,
+        }
+        self._update_namespace()
+
+    def _column(self, field):
+        """Return the strings of a field for every element id."""
+        strings = self.store.strings.get(field, [])
+        codes = self.store.codes.get(field)
+        if codes is None:
+            return [None] * self.store.size
+        return [strings[c] for c in codes]
+
+    def _count(self, column):
+        names, counts = np.unique(
+            np.asarray(column, dtype=object)[self.store.alive].astype(str),
+            return_counts=True)
+        return {str(k): int(v) for k, v in zip(names, counts)}
+
+    def _update_namespace(self):
+        ns = self._namespace
+        ns['targets_left'] = self.left_by_role.get('target', 0)
+        ns['distractors_left'] = self.left_by_role.get('distractor', 0)
+        ns['collected'] = self.collected
+        ns['targets_collected'] = self.collected_by_role.get('target', 0)
+        ns['distractors_collected'] = \
+            self.collected_by_role.get('distractor', 0)
+        ns['value_sum'] = self.value_sum
+
+    @property
+    def targets_left(self):
+        return self.left_by_role.get('target', 0)
+
+    @property
+    def elements_left(self):
+        return sum(self.left_by_role.values())
+
+    def only_left(self, *types):
+        """Return True if all live elements are of the given types."""
+        return sum(self.left_by_type.get(t, 0) for t in types) \
+            == self.elements_left
+
+    def collect(self, i):
+        """Account for element ``i`` having been collected."""
+        role = str(self._roles[i])
+        element_type = str(self._types[i])
+        self.left_by_role[role] -= 1
+        self.left_by_type[element_type] -= 1
+        self.collected_by_role[role] += 1
+        self.collected_by_type[element_type] += 1
+        self.collected += 1
+        self.value_sum += int(self.store.value[i])
+        self._update_namespace()
+
+    def complete(self):
+        """Return True if the stop rule is met."""
+        return bool(eval(self._code, self._namespace))
@@ -7,27 +7,14 @@ import base64
 import os
 from qtpy import QtCore, QtGui, QtWidgets
 from libqtopensesame.widgets.pool_widget import select_from_pool
-from .serialization_helpers import serialize_elements, deserialize_elements
+from .serialization_helpers import deserialize_elements
+from .element_model import ElementModel, enum_delegates
+from .change_pipeline import ChangePipeline
 
 
 class ElementList(QtWidgets.QWidget):
     textChanged = QtCore.Signal(str)
-    
-   
-    COL_ICON = 0
-    COL_IMAGE = 1
-    COL_TYPE = 2
-    COL_ROLE = 3
-    COL_VALUE = 4
-    COL_SOUND = 5
-    COL_ACTION = 6
-    COL_RESULT = 7
-    COL_AMOUNT = 8
-
-    HEADERS = [
-        "", "Image", "Type", "Role", "Value", "Click sound",
-        "Click action", "Click Result", "Amount"
-    ]
+
     def __init__(self, parent=None, experiment=None, main_window=None, plugin=None):
         super().__init__(parent)
         self.experiment = experiment
@@ -35,17 +22,27 @@ class ElementList(QtWidgets.QWidget):
         self.plugin = plugin
 
         # Table --------------------------------------------------------------
-        self.table = QtWidgets.QTableWidget()
-        self.table.setColumnCount(len(self.HEADERS))
-        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        self.model = ElementModel(
+            pool=experiment.pool if experiment else None, parent=self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(
             QtWidgets.QHeaderView.Stretch)
-        self.table.setColumnWidth(self.COL_ICON, 32)
+        self.table.horizontalHeader().setSectionResizeMode(
+            ElementModel.COL_ICON, QtWidgets.QHeaderView.Fixed)
+        self.table.setColumnWidth(ElementModel.COL_ICON, 32)
+        # Rows of equal height need not be measured one by one
+        self.table.verticalHeader().setSectionResizeMode(
+            QtWidgets.QHeaderView.Fixed)
+        self.table.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
         self.table.setEditTriggers(
             QtWidgets.QAbstractItemView.DoubleClicked |
             QtWidgets.QAbstractItemView.SelectedClicked |
             QtWidgets.QAbstractItemView.EditKeyPressed
         )
+        self.delegates = enum_delegates(self.table)
+        for col, delegate in self.delegates.items():
+            self.table.setItemDelegateForColumn(col, delegate)
 
         # Buttons -------------------------------------------------------------
         self.add_btn = QtWidgets.QPushButton("+")
@@ -68,12 +65,20 @@ class ElementList(QtWidgets.QWidget):
         v = QtWidgets.QVBoxLayout(self)
         v.addLayout(h)
 
+        # Edits are collected and serialized row by row
+        self.changes = ChangePipeline(self.model.encode_row,
+                                      self.textChanged.emit,
+                                      rows=0, parent=self)
+
     # Signals -------------------------------------------------------------
         self.add_btn.clicked.connect(self.add_item_dialog)
         self.remove_btn.clicked.connect(self.remove_selected_row)
 
-        self.table.itemChanged.connect(self.on_item_changed)
-        self.table.itemChanged.connect(plugin.apply_edit_changes)
+        self.model.dataChanged.connect(self.on_data_changed)
+        self.model.rowsInserted.connect(self.on_rows_inserted)
+        self.model.rowsRemoved.connect(self.on_rows_removed)
+        if plugin:
+            self.textChanged.connect(plugin.apply_edit_changes)
 
 
 
@@ -82,97 +87,44 @@ class ElementList(QtWidgets.QWidget):
     # ----------------------------------------------------------------------
 
     def text(self):
-        elements = []
-
-        for row in range(self.table.rowCount()):
-            element = {
-                "image": self._text(row, self.COL_IMAGE),
-                "type": self._text(row, self.COL_TYPE),
-                "role": self._text(row, self.COL_ROLE),
-                "value": int(self._text(row, self.COL_VALUE) or 0),
-                "click_sound": self._text(row, self.COL_SOUND),
-                "click_action": self._text(row, self.COL_ACTION),
-                "click_result": self._text(row, self.COL_RESULT),
-               "amount": self._text(row, self.COL_AMOUNT),
-            }
-            elements.append(element)
-
-        return serialize_elements(elements)
-
-
+        return self.changes.text()
 
     def setText(self, text):
-        self.table.blockSignals(True)
-        self.table.setRowCount(0)
-
-        elements = deserialize_elements(text)
-        for element in elements:
-            self._add_row(element)
+        # Applying the script sets the text it just read from this widget
+        if text == self.text():
+            self.changes.sync(text)
+            return
 
-        self.table.blockSignals(False)
-        self.textChanged.emit(self.text())
+        self.model.load(deserialize_elements(text))
+        self.changes.reset(self.model.rowCount())
+        self.changes.sync(text)
 
 
     # ----------------------------------------------------------------------
     # Helpers
     # ----------------------------------------------------------------------
 
-    def _text(self, row, col):
-        item = self.table.item(row, col)
-        return item.text() if item else ""
-
-    def _add_row(self, d):
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-
-        # Icon item
-        icon_item = QtWidgets.QTableWidgetItem()
-
-        image_name = d.get("image")
-        if image_name and self.experiment:
-            try:
-                pix = QtGui.QPixmap(self.experiment.pool[image_name]).scaled(
-                    32, 32,
-                    QtCore.Qt.KeepAspectRatio,
-                    QtCore.Qt.SmoothTransformation
-                )
-                icon_item.setIcon(QtGui.QIcon(pix))
-            except Exception:
-                pass
-
-        icon_item.setFlags(QtCore.Qt.ItemIsEnabled)
-        self.table.setItem(row, self.COL_ICON, icon_item)
-
-        # Other columns
-        for col, key in [
-            (self.COL_IMAGE, "image"),
-            (self.COL_TYPE, "type"),
-            (self.COL_ROLE, "role"),
-            (self.COL_VALUE, "value"),
-            (self.COL_SOUND, "click_sound"),
-            (self.COL_ACTION, "click_action"),
-            (self.COL_RESULT, "click_result"),
-            (self.COL_AMOUNT, "amount"),
-        ]:
-            item = QtWidgets.QTableWidgetItem(str(d.get(key, "")))
-            self.table.setItem(row, col, item)
-            
-        #self.table.resizeColumnsToContents()
-
-            
-        
+    def on_data_changed(self, top_left, bottom_right, roles=()):
+        # Icons are not part of the text
+        if bottom_right.column() == ElementModel.COL_ICON:
+            return
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            self.changes.mark(row)
+
+    def on_rows_inserted(self, parent, first, last):
+        for row in range(first, last + 1):
+            self.changes.insert(row)
+
+    def on_rows_removed(self, parent, first, last):
+        for row in range(last, first - 1, -1):
+            self.changes.remove(row)
 
-    def on_item_changed(self, item):
-        self.textChanged.emit(self.text())
-        
     def remove_selected_row(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             return  # no selection
 
-        self.table.removeRow(row)
-        self.textChanged.emit(self.text())
-        self.table.itemChanged.emit(None)
+        self.model.removeRows(row, 1)
 
 
     # ----------------------------------------------------------------------
@@ -283,8 +235,7 @@ class ElementList(QtWidgets.QWidget):
             "amount": amount_spin.value(),
         }
 
-        self._add_row(d)
-        self.textChanged.emit(self.text())
+        self.model.append(d)
 
 
 
@@ -0,0 +1,233 @@
+"""
+Table model and delegates behind the element list of the editor.
+"""
+
+from enum import Enum
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+from .element_schema import ElementType, Role, ClickAction, ClickResult
+from .serialization_helpers import serialize_elements
+from .thumbnail_cache import thumbnail_cache
+
+FIELDS = ElementType._fields
+DEFAULTS = ElementType._field_defaults
+# Enumerated fields are edited with a combo box
+ENUMS = {'role': Role, 'click_action': ClickAction,
+         'click_result': ClickResult}
+
+
+def _coerce(field, value):
+    """
+    Convert an edited or loaded value to the type of its field. Invalid
+    values are kept as they are, so that nothing the experimenter typed is
+    lost; they are reported when the item is prepared.
+    """
+    try:
+        return getattr(ElementType.from_dict({field: value}), field)
+    except ValueError:
+        return value
+
+
+def _record(element):
+    """Return the field values of an element dict, typed where valid."""
+    try:
+        return ElementType.from_dict(element)
+    except ValueError:
+        return tuple(_coerce(field, element.get(field, DEFAULTS[field]))
+                     for field in FIELDS)
+
+
+def _plain(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+class ElementModel(QtCore.QAbstractTableModel):
+    """
+    The element types of the item, stored by column.
+
+    Column 0 holds the thumbnail of the image, the other columns the fields
+    of ElementType in order. Each field is a list of typed values, so
+    loading and serializing touch plain Python lists instead of one item
+    object per cell. Edits emit ``dataChanged`` for the edited cell only,
+    and a loaded thumbnail only for the icons of the rows that show it.
+    Thumbnails are requested when a row is first shown.
+
+    Parameters
+    ----------
+    pool : dict-like, optional
+        Maps pool file names to paths, used for the thumbnails.
+    """
+
+    COL_ICON = 0
+    HEADERS = ["", "Image", "Type", "Role", "Value", "Click sound",
+               "Click action", "Click Result", "Amount"]
+
+    def __init__(self, pool=None, parent=None):
+        super().__init__(parent)
+        self.pool = pool
+        self.columns = {field: [] for field in FIELDS}
+        self._icons = {}
+
+    @staticmethod
+    def column(field):
+        return FIELDS.index(field) + 1
+
+    @staticmethod
+    def field(column):
+        return FIELDS[column - 1] if column > 0 else None
+
+    # ------------------------------------------------------------------
+    # Model interface
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns['image'])
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal \
+                and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def flags(self, index):
+        if index.column() == self.COL_ICON:
+            return QtCore.Qt.ItemIsEnabled
+        return QtCore.Qt.ItemIsEnabled | QtCore.Qt.ItemIsSelectable \
+            | QtCore.Qt.ItemIsEditable
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if index.column() == self.COL_ICON:
+            if role == QtCore.Qt.DecorationRole:
+                return self._icon(self.columns['image'][row])
+            return None
+        if role in (QtCore.Qt.DisplayRole, QtCore.Qt.EditRole):
+            value = _plain(self.columns[self.field(index.column())][row])
+            return str(value) if role == QtCore.Qt.DisplayRole else value
+        return None
+
+    def setData(self, index, value, role=QtCore.Qt.EditRole):
+        field = self.field(index.column())
+        if role != QtCore.Qt.EditRole or field is None:
+            return False
+        value = _coerce(field, value)
+        column = self.columns[field]
+        if column[index.row()] == value:
+            return False
+        column[index.row()] = value
+        self.dataChanged.emit(index, index, [role])
+        if field == 'image':
+            icon = self.index(index.row(), self.COL_ICON)
+            self.dataChanged.emit(icon, icon, [QtCore.Qt.DecorationRole])
+        return True
+
+    def removeRows(self, row, count, parent=QtCore.QModelIndex()):
+        if count <= 0 or row < 0 or row + count > self.rowCount():
+            return False
+        self.beginRemoveRows(parent, row, row + count - 1)
+        for column in self.columns.values():
+            del column[row:row + count]
+        self.endRemoveRows()
+        return True
+
+    # ------------------------------------------------------------------
+    # Elements
+    # ------------------------------------------------------------------
+
+    def load(self, elements):
+        """Replace all rows by elements, a list of dicts."""
+        self.beginResetModel()
+        rows = [_record(e) for e in elements]
+        columns = zip(*rows) if rows else [()] * len(FIELDS)
+        self.columns = {field: list(column)
+                        for field, column in zip(FIELDS, columns)}
+        self.endResetModel()
+
+    def append(self, element):
+        """Add an element dict as the last row."""
+        row = self.rowCount()
+        self.beginInsertRows(QtCore.QModelIndex(), row, row)
+        for column, value in zip(self.columns.values(), _record(element)):
+            column.append(value)
+        self.endInsertRows()
+
+    def element(self, row):
+        """Return the element of a row as a dict of plain values."""
+        return {field: _plain(column[row])
+                for field, column in self.columns.items()}
+
+    def encode_row(self, row):
+        """Return the serialized line of a row."""
+        return serialize_elements(self.element(row))
+
+    # ------------------------------------------------------------------
+    # Thumbnails
+    # ------------------------------------------------------------------
+
+    def _icon(self, image_name):
+        if not image_name or self.pool is None:
+            return None
+        if image_name in self._icons:
+            return self._icons[image_name]
+        # Requested once; the icon stays empty until the thumbnail is ready
+        self._icons[image_name] = None
+        try:
+            path = self.pool[image_name]
+        except Exception:
+            return None
+        if path:
+            thumbnail_cache().request(
+                path, lambda pix, name=image_name: self._set_icon(name, pix))
+        # Set already if the thumbnail was in memory
+        return self._icons[image_name]
+
+    def _set_icon(self, image_name, pixmap):
+        self._icons[image_name] = QtGui.QIcon(pixmap)
+        # Only the icon cells of the rows that show this image are updated,
+        # one contiguous range at a time
+        first = None
+        images = self.columns['image']
+        for row in range(len(images) + 1):
+            match = row < len(images) and images[row] == image_name
+            if match and first is None:
+                first = row
+            elif not match and first is not None:
+                self.dataChanged.emit(
+                    self.index(first, self.COL_ICON),
+                    self.index(row - 1, self.COL_ICON),
+                    [QtCore.Qt.DecorationRole])
+                first = None
+
+
+class ComboDelegate(QtWidgets.QStyledItemDelegate):
+    """Edits a column with a combo box that offers a fixed set of values."""
+
+    def __init__(self, options, parent=None):
+        super().__init__(parent)
+        self.options = list(options)
+
+    def createEditor(self, parent, option, index):
+        combo = QtWidgets.QComboBox(parent)
+        combo.addItems(self.options)
+        # Commit as soon as a value is picked
+        combo.activated.connect(lambda _: self.commitData.emit(combo))
+        return combo
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(str(index.data(QtCore.Qt.EditRole)))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), QtCore.Qt.EditRole)
+
+
+def enum_delegates(parent=None):
+    """Return a ComboDelegate per column of an enumerated field."""
+    return {ElementModel.column(field):
+            ComboDelegate([e.value for e in enum], parent)
+            for field, enum in ENUMS.items()}
@@ -0,0 +1,118 @@
+"""
+Typed, validated element types compiled from the item script.
+"""
+
+from enum import Enum
+from functools import lru_cache
+from typing import NamedTuple
+
+from .serialization_helpers import parse_elements
+
+
+class Role(str, Enum):
+    TARGET = 'target'
+    DISTRACTOR = 'distractor'
+
+
+class ClickAction(str, Enum):
+    CLICK = 'click'
+    DOUBLE_CLICK = 'double click'
+    MOUSE_OVER = 'mouse over'
+
+
+class ClickResult(str, Enum):
+    VANISH = 'vanish'
+    REMAIN = 'remain'
+
+
+class ElementType(NamedTuple):
+    """
+    One row of the element list. Records are immutable, so compiled
+    element lists can be shared between trials and callers.
+    """
+    image: str = ''
+    type: str = ''
+    role: Role = Role.TARGET
+    value: int = 0
+    click_sound: str = ''
+    click_action: ClickAction = ClickAction.CLICK
+    click_result: ClickResult = ClickResult.VANISH
+    amount: int = 0
+
+    @classmethod
+    def from_dict(cls, d):
+        """
+        Build an ElementType from a parsed element dict, coercing numbers
+        and checking the enumerated fields. Empty fields get the defaults.
+
+        Raises:
+            ValueError: If a field has an invalid value.
+        """
+        return cls(
+            image=str(d.get('image') or ''),
+            type=str(d.get('type') or ''),
+            role=_enum(Role, d.get('role'), Role.TARGET),
+            value=_int(d.get('value'), 'value'),
+            click_sound=str(d.get('click_sound') or ''),
+            click_action=_enum(ClickAction, d.get('click_action'),
+                               ClickAction.CLICK),
+            click_result=_enum(ClickResult, d.get('click_result'),
+                               ClickResult.VANISH),
+            amount=_int(d.get('amount'), 'amount', minimum=0),
+        )
+
+    def to_dict(self):
+        """Return the fields as a dict of plain strings and numbers."""
+        return {k: v.value if isinstance(v, Enum) else v
+                for k, v in zip(self._fields, self)}
+
+
+def _enum(enum, value, default):
+    if value in (None, ''):
+        return default
+    try:
+        return enum(value)
+    except ValueError:
+        raise ValueError(
+            f"Invalid {enum.__name__} {value!r}, expected one of: "
+            + ", ".join(e.value for e in enum))
+
+
+def _int(value, name, minimum=None):
+    if value in (None, ''):
+        return 0
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} {value!r}, expected a number")
+    if minimum is not None and number < minimum:
+        raise ValueError(f"Invalid {name} {value!r}, expected at least "
+                         f"{minimum}")
+    return number
+
+
+def as_element_type(element):
+    """Return element as ElementType, converting it if it is a dict."""
+    if isinstance(element, ElementType):
+        return element
+    return ElementType.from_dict(element)
+
+
+@lru_cache(maxsize=64)
+def compile_elements(text):
+    """
+    Parse and validate the serialized elements of an item.
+
+    The result is cached by text, so an unchanged item script is compiled
+    only once, no matter how many trials prepare it.
+
+    Args:
+        text (str): Serialized elements string.
+
+    Returns:
+        tuple of ElementType: The element types, also if there is only one.
+    """
+    if not text:
+        return ()
+    return tuple(ElementType.from_dict(d)
+                 for d in parse_elements(str(text)) if isinstance(d, dict))
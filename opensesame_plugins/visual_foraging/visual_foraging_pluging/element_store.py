@@ -0,0 +1,117 @@
+"""
+Compact struct-of-arrays storage for element instances.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+
+
+class ElementStore:
+    """
+    Element instances of a trial, stored column-wise in NumPy arrays.
+
+    Positions and values are numeric columns. Every other field (image,
+    type, role, click_sound, ...) is interned: the column holds small
+    integer codes into ``self.strings[field]``. Vanishing an element only
+    clears its ``alive`` flag, so element ids stay valid for the whole
+    trial.
+
+    Iterating over the store yields a dict-like ``ElementView`` for every
+    live element, so code written against the old list of instance dicts
+    keeps working.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Element positions.
+    value : array-like
+        Element values.
+    codes : dict
+        Maps a field name to an array of integer codes, one per element.
+    strings : dict
+        Maps a field name to the list of strings its codes refer to.
+    """
+
+    NUMERIC_FIELDS = ('x', 'y', 'value')
+
+    def __init__(self, x, y, value, codes, strings):
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.value = np.asarray(value, dtype=np.int32)
+        self.codes = {k: np.asarray(v, dtype=np.int16)
+                      for k, v in codes.items()}
+        self.strings = {k: list(v) for k, v in strings.items()}
+        self.fields = self.NUMERIC_FIELDS + tuple(self.codes)
+        self.alive = np.ones(len(self.x), dtype=bool)
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def __iter__(self):
+        for i in self.live_ids():
+            yield ElementView(self, int(i))
+
+    def __getitem__(self, i):
+        return ElementView(self, i)
+
+    @property
+    def size(self):
+        """Number of elements including vanished ones."""
+        return len(self.alive)
+
+    def live_ids(self):
+        """Return the ids of all elements that have not vanished."""
+        return np.flatnonzero(self.alive)
+
+    def code(self, field, string):
+        """Return the code of ``string`` in ``field``, or -1 if unused."""
+        try:
+            return self.strings[field].index(string)
+        except (KeyError, ValueError):
+            return -1
+
+    def matches(self, field, strings):
+        """
+        Return a boolean mask of all elements, vanished or not, whose field
+        is one of ``strings``. If the store has no such field, its value is
+        taken to be None.
+        """
+        if field not in self.codes:
+            return np.full(self.size, None in strings)
+        codes = [self.code(field, s) for s in strings]
+        return np.isin(self.codes[field], [c for c in codes if c >= 0])
+
+    def get(self, i, field):
+        """Return the value of ``field`` for element ``i``."""
+        if field in self.NUMERIC_FIELDS:
+            return getattr(self, field)[i].item()
+        return self.strings[field][self.codes[field][i]]
+
+    def remove(self, i):
+        """Vanish element ``i``."""
+        self.alive[i] = False
+
+
+class ElementView(Mapping):
+    """Read-only dict-like view of a single element in an ElementStore."""
+
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, i):
+        self.store = store
+        self.id = i
+
+    def __getitem__(self, key):
+        if key not in self.store.fields:
+            raise KeyError(key)
+        return self.store.get(self.id, key)
+
+    def __iter__(self):
+        return iter(self.store.fields)
+
+    def __len__(self):
+        return len(self.store.fields)
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -0,0 +1,121 @@
+"""
+Per-trial log of input events and their outcome.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .input_helpers import DOWN, DOUBLE_CLICK, MOTION
+
+# Codes of the input kinds in the 'input' column
+INPUT_CODES = {DOWN: 0, DOUBLE_CLICK: 1, MOTION: 2}
+INPUT_KINDS = {code: kind for kind, code in INPUT_CODES.items()}
+
+# Outcomes in the 'element' column that are not a collected element
+MISS = -1
+ON_DOUBLE_CLICK = -2
+
+# Writes log files after the trial, so the frame loop never touches disk
+_writer = ThreadPoolExecutor(max_workers=1)
+
+
+class EventLog:
+    """
+    Ring buffer of the input events of a trial.
+
+    Every event is stored as one row of preallocated column arrays: the
+    time in ms since onset, the position, the input kind (see INPUT_CODES)
+    and the id of the element it collected, MISS, or ON_DOUBLE_CLICK for a
+    click on an element that is collected by a double click. Recording
+    only writes scalars into these arrays. If a trial has more events than
+    the capacity, the oldest ones are overwritten.
+
+    Parameters
+    ----------
+    capacity : int
+        Number of events kept.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self.time = np.zeros(capacity)
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.input = np.zeros(capacity, dtype=np.uint8)
+        self.element = np.zeros(capacity, dtype=np.int32)
+        self.count = 0
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def clear(self):
+        self.count = 0
+
+    def record(self, time, x, y, kind, element=MISS):
+        i = self.count % self.capacity
+        self.time[i] = time
+        self.x[i] = x
+        self.y[i] = y
+        self.input[i] = INPUT_CODES[kind]
+        self.element[i] = element
+        self.count += 1
+
+    def columns(self):
+        """Return copies of the recorded columns, oldest event first."""
+        order = np.arange(self.count - len(self), self.count) \
+            % self.capacity
+        return {
+            'time': self.time[order],
+            'x': self.x[order],
+            'y': self.y[order],
+            'input': self.input[order],
+            'element': self.element[order],
+        }
+
+    def summary(self, store):
+        """
+        Return the events as experiment variables. Clicks are mouse button
+        presses; a double click adds no click of its own. Collected
+        elements are listed by type.
+        """
+        c = self.columns()
+        clicks = c['input'] == INPUT_CODES[DOWN]
+        collected = c['element'] >= 0
+        missed = c['element'] == MISS
+        types = store.strings.get('type', [])
+        type_codes = store.codes.get('type')
+        return {
+            'n_clicks': int(np.count_nonzero(clicks)),
+            'n_collections': int(np.count_nonzero(collected)),
+            'n_misses': int(np.count_nonzero(clicks & missed)),
+            'collection_times': [round(float(t), 3)
+                                 for t in c['time'][collected]],
+            'collection_types': [types[type_codes[i]]
+                                 for i in c['element'][collected]]
+            if type_codes is not None else [],
+        }
+
+    def save(self, path, **extra):
+        """
+        Write the events to a .npz file on a background thread and return
+        the Future of the write. Keyword arguments are saved as additional
+        arrays, e.g. the layout of the trial.
+        """
+        columns = self.columns()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        return _writer.submit(np.savez, path, **columns, **extra)
+
+
+def flush():
+    """Wait until all event logs saved so far have been written."""
+    _writer.submit(lambda: None).result()
+
+
+def load_event_log(path):
+    """Return all arrays of an event log file written by EventLog.save()."""
+    with np.load(path) as f:
+        return {name: f[name] for name in f.files}
@@ -0,0 +1,92 @@
+"""
+Process-wide cache of display-format element images.
+"""
+
+import os
+from collections import OrderedDict
+
+import pygame
+
+
+class ImageCache:
+    """
+    LRU cache of images converted to the display's pixel format.
+
+    Images are keyed by file path and modification time, so editing a file
+    in the pool replaces its cached surface. Loaded images are converted
+    with ``convert_alpha()`` (or ``convert()`` for images without alpha)
+    once, which saves a pixel-format conversion on every blit. When the
+    surfaces exceed the memory budget the least recently used ones are
+    dropped.
+
+    Parameters
+    ----------
+    budget : int
+        Memory budget in bytes.
+    """
+
+    def __init__(self, budget=256 * 2 ** 20):
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._surfaces = OrderedDict()
+
+    def __len__(self):
+        return len(self._surfaces)
+
+    def peek(self, path):
+        """
+        Return the cached surface for ``path`` or None, without counting a
+        hit or miss. Safe to call from other threads.
+        """
+        return self._surfaces.get((path, os.path.getmtime(path)))
+
+    def get(self, path, surface=None):
+        """
+        Return the display-format surface for the image at ``path``. On a
+        miss, ``surface`` is used instead of loading the file if given, e.g.
+        an image decoded by another thread.
+        """
+        key = (path, os.path.getmtime(path))
+        cached = self._surfaces.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return cached
+
+        self.misses += 1
+        if surface is None:
+            surface = pygame.image.load(path)
+        if pygame.display.get_surface() is not None:
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+        for stale in [k for k in self._surfaces if k[0] == path]:
+            self._discard(stale)
+        self._surfaces[key] = surface
+        self.nbytes += self._size(surface)
+        self.evict()
+        return surface
+
+    def evict(self):
+        """Drop least recently used surfaces until the budget is met."""
+        while self.nbytes > self.budget and len(self._surfaces) > 1:
+            self._discard(next(iter(self._surfaces)))
+
+    def clear(self):
+        self._surfaces.clear()
+        self.nbytes = 0
+
+    def _discard(self, key):
+        self.nbytes -= self._size(self._surfaces.pop(key))
+
+    @staticmethod
+    def _size(surface):
+        return surface.get_bytesize() * surface.get_width() \
+            * surface.get_height()
+
+
+# Shared by all items and trials of the experiment
+image_cache = ImageCache()
@@ -1,9 +1,13 @@
 """
-Helper function for waiting for a mouse click in pygame.
+Helper functions for mouse input in pygame.
 """
 
+from collections import namedtuple
+
 import pygame
 
+from . import timing_helpers
+
 
 def get_click(timeout=None, double_click_interval=400):
     """
@@ -63,3 +67,115 @@ def get_click(timeout=None, double_click_interval=400):
 
         clock.tick(60)
 
+
+
+# Kinds of events returned by EventPump.poll()
+DOWN = 'down'
+UP = 'up'
+MOTION = 'motion'
+DOUBLE_CLICK = 'double click'
+QUIT = 'quit'
+
+# Event kind that triggers each of the element list's click actions
+CLICK_ACTIONS = {
+    'click': DOWN,
+    'double click': DOUBLE_CLICK,
+    'mouse over': MOTION,
+}
+
+InputEvent = namedtuple('InputEvent', ['kind', 'x', 'y', 'button', 'time'])
+
+
+class EventPump:
+    """
+    Drains the pygame event queue without blocking.
+
+    Call ``poll()`` once per frame, and ``wait()`` instead of sleeping until
+    the next frame, so that events are timestamped when they arrive rather
+    than when the next frame polls them. Unless ``coalesce_motion`` is
+    False, mouse motion is coalesced so that at most one MOTION event, with
+    the latest position, is returned per poll. A DOWN event that follows a
+    previous DOWN at the same position within ``double_click_interval`` is
+    followed by a DOUBLE_CLICK event.
+
+    Parameters
+    ----------
+    double_click_interval : int
+        Maximum time between clicks to count as double click (ms).
+    coalesce_motion : bool
+        Whether to keep only the last motion of a poll. Pass False when
+        every position the pointer passes must be hit-tested.
+    """
+
+    def __init__(self, double_click_interval=400, coalesce_motion=True):
+        self.double_click_interval = double_click_interval
+        self.coalesce_motion = coalesce_motion
+        self.last_click_time = None
+        self.last_pos = None
+        self.events = []
+
+    def wait(self, deadline):
+        """
+        Wait until ``deadline``, on the ``timing_helpers.now()`` clock,
+        taking events from the queue as they arrive.
+        """
+        while True:
+            remaining = deadline - timing_helpers.now()
+            if remaining <= 0:
+                return
+            if remaining >= 0.001:
+                # A timeout of 0 would wait forever
+                event = pygame.event.wait(int(remaining * 1000))
+                if event.type != pygame.NOEVENT:
+                    self._add(event, timing_helpers.now())
+            else:
+                for event in pygame.event.get():
+                    self._add(event, timing_helpers.now())
+
+    def poll(self):
+        """
+        Return the events that arrived since the last poll.
+
+        Returns
+        -------
+        events : list of InputEvent
+            'time' is the time at which the event was taken from the queue,
+            by ``wait()`` or ``poll()``, in seconds on the
+            ``timing_helpers.now()`` clock.
+        """
+        for event in pygame.event.get():
+            self._add(event, timing_helpers.now())
+        events, self.events = self.events, []
+        if self.coalesce_motion:
+            motion = [e for e in events if e.kind == MOTION]
+            if motion:
+                events = [e for e in events if e.kind != MOTION]
+                events.append(motion[-1])
+        return events
+
+    def _add(self, event, t):
+        events = self.events
+        if event.type == pygame.QUIT:
+            events.append(InputEvent(QUIT, None, None, None, t))
+
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            x, y = event.pos
+            events.append(InputEvent(DOWN, x, y, event.button, t))
+            if self.last_click_time is not None \
+                    and (t - self.last_click_time) * 1000 \
+                    <= self.double_click_interval \
+                    and self.last_pos == (x, y):
+                events.append(
+                    InputEvent(DOUBLE_CLICK, x, y, event.button, t))
+                self.last_click_time = None
+            else:
+                self.last_click_time = t
+            self.last_pos = (x, y)
+
+        elif event.type == pygame.MOUSEBUTTONUP:
+            x, y = event.pos
+            events.append(InputEvent(UP, x, y, event.button, t))
+
+        elif event.type == pygame.MOUSEMOTION:
+            x, y = event.pos
+            events.append(InputEvent(MOTION, x, y, None, t))
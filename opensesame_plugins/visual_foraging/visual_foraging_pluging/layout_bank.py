@@ -0,0 +1,220 @@
+"""
+Precomputed trial layouts stored in a memory-mapped file.
+
+A layout bank consists of two files: ``<name>.npy`` holds the positions of
+all trials as one record array of LAYOUT_DTYPE, and ``<name>.index.npz``
+holds the offset of every trial in that array plus a hash of the
+configuration the layouts were generated from.
+
+Build a bank from the command line, e.g.::
+
+    python -m opensesame_plugins.visual_foraging.visual_foraging_pluging.layout_bank \\
+        --elements elements.txt --location-settings "<mode: poisson, spacing: 1.2>" \\
+        --width 1024 --height 768 --pool __pool__ --seed 1 --trials 500 layouts.npy
+
+and put both files in the file pool. Trials are generated in parallel on
+all cores unless ``--workers`` says otherwise.
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .element_schema import compile_elements, as_element_type
+from .layout_helpers import (parse_location_settings, generate_positions,
+                             make_rng, SIZED_LAYOUTS)
+
+LAYOUT_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('element', '<u2')])
+
+
+def layout_hash(element_types, location_settings, width, height,
+                sprite_size, seed):
+    """
+    Return a hash of everything the layouts depend on, so that a bank built
+    for another configuration is recognized as stale. The sprite size only
+    counts for layouts that use it.
+    """
+    settings = parse_location_settings(location_settings)
+    config = {
+        'elements': [as_element_type(et).to_dict() for et in element_types],
+        'location_settings': settings,
+        'width': int(width),
+        'height': int(height),
+        'sprite_size': float(sprite_size)
+        if settings.get('mode') in SIZED_LAYOUTS else None,
+        'seed': str(seed).strip(),
+    }
+    text = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def trial_layout(element_types, location_settings, width, height,
+                 sprite_size, seed, trial):
+    """
+    Return the layout of one trial as a LAYOUT_DTYPE record array, in the
+    same order as the instances of get_element_store().
+    """
+    amounts = [as_element_type(et).amount for et in element_types]
+    positions = generate_positions(
+        parse_location_settings(location_settings), sum(amounts), width,
+        height, make_rng(seed, trial), sprite_size)
+    layout = np.empty(sum(amounts), dtype=LAYOUT_DTYPE)
+    layout['x'] = positions[:, 0]
+    layout['y'] = positions[:, 1]
+    layout['element'] = np.repeat(np.arange(len(amounts)), amounts)
+    return layout
+
+
+def index_path(path):
+    return os.path.splitext(path)[0] + '.index.npz'
+
+
+def build_layout_bank(path, element_types, location_settings, width, height,
+                      sprite_size=0, seed='', n_trials=100, workers=None):
+    """
+    Generate n_trials layouts and write them to a layout bank at path.
+
+    The layouts are the ones VisualForaging.prepare() would generate for
+    trials 0 to n_trials - 1 with the same seed. Trials are generated on a
+    pool of worker processes (all cores by default; 1 generates them in
+    this process) and written in trial order as they arrive. Every trial
+    draws from its own random stream, so the file does not depend on the
+    number of workers. Without a seed, a random master seed is drawn.
+    """
+    n = sum(as_element_type(et).amount for et in element_types)
+    master_seed = seed if str(seed).strip() \
+        else np.random.SeedSequence().entropy
+    generate = functools.partial(trial_layout, element_types,
+                                 location_settings, width, height,
+                                 sprite_size, master_seed)
+    records = np.lib.format.open_memmap(path, mode='w+', dtype=LAYOUT_DTYPE,
+                                        shape=(n_trials * n,))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        layouts = map(generate, range(n_trials))
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, n_trials // (4 * workers))
+        layouts = executor.map(generate, range(n_trials),
+                               chunksize=chunksize)
+    try:
+        for trial, layout in enumerate(layouts):
+            records[trial * n:(trial + 1) * n] = layout
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    records.flush()
+    del records
+    np.savez(index_path(path),
+             offsets=np.arange(n_trials + 1, dtype=np.int64) * n,
+             hash=layout_hash(element_types, location_settings, width,
+                              height, sprite_size, seed))
+
+
+class LayoutBank:
+    """
+    Read-only, memory-mapped access to a layout bank.
+
+    Parameters
+    ----------
+    path : str
+        Path of the ``.npy`` file. The index is expected next to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with np.load(index_path(path)) as index:
+            self.offsets = index['offsets']
+            self.hash = str(index['hash'])
+        self.records = np.load(path, mmap_mode='r')
+        self.wrapped = False
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def positions(self, trial):
+        """
+        Return the (n, 2) positions of a trial. Trials past the end of the
+        bank wrap around and reuse its layouts, with a warning the first
+        time this happens.
+        """
+        if trial >= len(self) and not self.wrapped:
+            self.wrapped = True
+            warnings.warn(f"Trial {trial} is past the end of layout bank "
+                          f"{self.path} ({len(self)} trials), so its "
+                          "layouts are reused from the start")
+        trial %= len(self)
+        layout = self.records[self.offsets[trial]:self.offsets[trial + 1]]
+        return np.column_stack((layout['x'], layout['y']))
+
+
+_banks = {}
+
+
+def open_layout_bank(path, expected_hash):
+    """
+    Return the LayoutBank at path, opened once per process, or None with a
+    warning if it was built for another configuration.
+    """
+    key = (path, os.path.getmtime(path))
+    if key not in _banks:
+        _banks[key] = LayoutBank(path)
+    bank = _banks[key]
+    if bank.hash != expected_hash:
+        warnings.warn(f"Layout bank {path} was built for a different "
+                      "configuration and is ignored")
+        return None
+    return bank
+
+
+def _sprite_size(element_types, pool):
+    import pygame
+    return max([max(pygame.image.load(os.path.join(pool, et.image))
+                    .get_size()) for et in element_types] or [0])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Precompute trial layouts for the visual foraging item")
+    parser.add_argument('path', help="Output .npy file")
+    parser.add_argument('--elements', required=True,
+                        help="File with the item's elements (angle-brace "
+                             "format, one element per line)")
+    parser.add_argument('--location-settings', default='',
+                        help="The item's location_settings")
+    parser.add_argument('--width', type=int, required=True)
+    parser.add_argument('--height', type=int, required=True)
+    parser.add_argument('--pool', help="Directory with the element images, "
+                                       "used to determine the sprite size")
+    parser.add_argument('--sprite-size', type=float, default=0,
+                        help="Size of the largest element image, if "
+                             "--pool is not given (poisson layouts only)")
+    parser.add_argument('--seed', default='')
+    parser.add_argument('--trials', type=int, default=100)
+    parser.add_argument('--workers', type=int,
+                        help="Number of worker processes (default: all "
+                             "cores)")
+    args = parser.parse_args()
+
+    with open(args.elements) as f:
+        element_types = compile_elements(f.read())
+    sprite_size = _sprite_size(element_types, args.pool) if args.pool \
+        else args.sprite_size
+    if not sprite_size and parse_location_settings(
+            args.location_settings).get('mode') in SIZED_LAYOUTS:
+        parser.error("this layout depends on the sprite size; give --pool "
+                     "or --sprite-size")
+    build_layout_bank(args.path, element_types, args.location_settings,
+                      args.width, args.height, sprite_size, args.seed,
+                      args.trials, args.workers)
+
+
+if __name__ == '__main__':
+    main()
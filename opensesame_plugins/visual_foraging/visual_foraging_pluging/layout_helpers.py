@@ -0,0 +1,247 @@
+"""
+Generation of element positions from the location settings.
+"""
+
+import numpy as np
+
+# Fraction of the area r**2 * n that a maximal Poisson-disc sample of n
+# points with minimum distance r covers
+POISSON_DENSITY = 0.62
+
+# Cells around a grid cell that can hold points closer than the minimum
+# distance (the 5x5 block without its corners)
+_NEIGHBOURHOOD = [(dy, dx) for dy in range(-2, 3) for dx in range(-2, 3)
+                  if abs(dx) + abs(dy) < 4]
+
+
+class LayoutError(ValueError):
+    """Raised when the requested elements do not fit the layout."""
+    pass
+
+
+def parse_location_settings(text):
+    """
+    Parse the location settings written by LocationSelector.
+
+    Args:
+        text (str): Settings such as "<mode: grid, rows: 7, cols: 12, ...>".
+
+    Returns:
+        dict: The mode as string and all other settings as numbers. An
+        empty dict if the text is empty or malformed.
+    """
+    text = str(text or "").strip()
+    if not (text.startswith("<") and text.endswith(">")):
+        return {}
+    settings = {}
+    for part in text[1:-1].split(","):
+        key, sep, value = part.partition(":")
+        if not sep:
+            continue
+        key, value = key.strip(), value.strip()
+        try:
+            settings[key] = float(value)
+        except ValueError:
+            settings[key] = value
+    return settings
+
+
+def make_rng(seed=None, trial=0):
+    """
+    Return a NumPy random generator. With a seed, each trial gets its own
+    independent, reproducible stream, spawned from the seed by trial
+    number; without one, layouts are random.
+    """
+    if seed is None or str(seed).strip() == "":
+        return np.random.default_rng()
+    return np.random.default_rng(
+        np.random.SeedSequence(int(seed), spawn_key=(int(trial),)))
+
+
+def grid_positions(n, width, height, rng, rows=7, cols=12, jitter_x=0,
+                   jitter_y=0, spacing_x=120, spacing_y=120, **kwargs):
+    """
+    Place n elements in distinct cells of a grid centered on the screen,
+    each displaced by uniform jitter.
+    """
+    rows, cols = int(rows), int(cols)
+    if n > rows * cols:
+        raise LayoutError(
+            f"{n} elements do not fit into a {rows}x{cols} grid")
+    cells = rng.choice(rows * cols, size=n, replace=False)
+    row, col = np.divmod(cells, cols)
+    positions = np.empty((n, 2))
+    positions[:, 0] = width / 2 + (col - (cols - 1) / 2) * spacing_x
+    positions[:, 1] = height / 2 + (row - (rows - 1) / 2) * spacing_y
+    positions += rng.uniform(-1, 1, (n, 2)) * (jitter_x, jitter_y)
+    return positions
+
+
+def scatter_positions(n, width, height, rng, mean_x=0, mean_y=0, std_x=50,
+                      std_y=50, **kwargs):
+    """
+    Draw n positions from a normal distribution around the screen center
+    (offset by the mean), clipped to the screen.
+    """
+    positions = rng.normal((width / 2 + mean_x, height / 2 + mean_y),
+                           (std_x, std_y), (n, 2))
+    return np.clip(positions, 0, (width, height), out=positions)
+
+
+def poisson_disc(width, height, r, rng, k=30, chunk=6):
+    """
+    Fill a width x height area with points at least r apart.
+
+    This is Bridson's algorithm with a background grid of cells of size
+    r / sqrt(2), so that every cell holds at most one point. Instead of
+    growing one active point at a time, every round grows all active
+    points at once. Each one tries up to k candidates in the annulus
+    [r, 2r], chunk candidates at a time, and proposes the first candidate
+    that is far enough from all points. Proposals that conflict with each
+    other are resolved in favour of the first one. Active points that find
+    no candidate are retired.
+
+    Returns:
+        numpy.ndarray: Array of shape (m, 2) with the sampled points.
+    """
+    cell = r / np.sqrt(2)
+    gw, gh = int(np.ceil(width / cell)), int(np.ceil(height / cell))
+    # The grid is padded by two cells on each side so that neighbourhoods
+    # never leave it. Empty cells hold -1, which refers to the sentinel
+    # point far away at the end of x and y.
+    stride = gw + 4
+    grid = np.full((gh + 4) * stride, -1, dtype=np.intp)
+    claim = np.full_like(grid, -1)
+    offsets = np.array([dy * stride + dx for dy, dx in _NEIGHBOURHOOD])
+    x = np.empty(gw * gh + 1)
+    y = np.empty(gw * gh + 1)
+    x[-1] = y[-1] = -1e9
+    r2 = r * r
+
+    def cell_of(px, py):
+        return ((py / cell).astype(np.intp) + 2) * stride \
+            + (px / cell).astype(np.intp) + 2
+
+    def far(px, py, cells, lookup, pts_x, pts_y):
+        neigh = lookup[cells[:, None] + offsets]
+        dx = pts_x[neigh] - px[:, None]
+        dy = pts_y[neigh] - py[:, None]
+        return neigh, dx * dx + dy * dy >= r2
+
+    x[0], y[0] = rng.uniform(0, width), rng.uniform(0, height)
+    grid[cell_of(x[:1], y[:1])] = 0
+    n = 1
+    active = np.zeros(1, dtype=np.intp)
+    while len(active):
+        px = np.full(len(active), np.nan)
+        py = np.full(len(active), np.nan)
+        todo = np.arange(len(active))
+        for _ in range(0, k, chunk):
+            a = len(todo)
+            angle = rng.uniform(0, 2 * np.pi, (a, chunk))
+            dist = r * np.sqrt(rng.uniform(1, 4, (a, chunk)))
+            cx = (x[active[todo]][:, None] + np.cos(angle) * dist).ravel()
+            cy = (y[active[todo]][:, None] + np.sin(angle) * dist).ravel()
+            ok = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+            test = np.flatnonzero(ok)
+            cells = cell_of(cx[test], cy[test])
+            empty = grid[cells] < 0
+            test, cells = test[empty], cells[empty]
+            ok[:] = False
+            ok[test] = far(cx[test], cy[test], cells, grid, x, y)[1] \
+                .all(axis=1)
+            ok = ok.reshape(a, chunk)
+            found = ok.any(axis=1)
+            pick = np.flatnonzero(found) * chunk + ok.argmax(axis=1)[found]
+            px[todo[found]] = cx[pick]
+            py[todo[found]] = cy[pick]
+            todo = todo[~found]
+            if not len(todo):
+                break
+
+        found = ~np.isnan(px)
+        px, py = px[found], py[found]
+        cells = cell_of(px, py)
+        order = np.arange(len(cells))
+        claim[cells] = len(cells)
+        np.minimum.at(claim, cells, order)
+        neigh, ok = far(px, py, cells, claim,
+                        np.append(px, -1e9), np.append(py, -1e9))
+        accept = (ok | (neigh < 0) | (neigh >= order[:, None])).all(axis=1)
+        claim[cells] = -1
+
+        new = np.arange(n, n + np.count_nonzero(accept))
+        x[new] = px[accept]
+        y[new] = py[accept]
+        grid[cells[accept]] = new
+        n += len(new)
+        active = np.concatenate((active[found], new))
+    return np.column_stack((x[:n], y[:n]))
+
+
+def poisson_positions(n, width, height, rng, spacing=1.0, sprite_size=0,
+                      **kwargs):
+    """
+    Place n elements so that their centers are at least spacing *
+    sprite_size pixels apart and all sprites lie on the screen.
+
+    The screen is filled with a Poisson-disc sample of which n points are
+    picked at random. If the screen has room for many more elements than
+    requested, the sampling distance is raised so that about 2n points are
+    sampled. This bounds the cost and spreads the elements over the whole
+    screen.
+    """
+    if n == 0:
+        return np.empty((0, 2))
+    r = max(spacing * sprite_size, 1.0)
+    margin = sprite_size / 2
+    w, h = width - 2 * margin, height - 2 * margin
+    if w <= 0 or h <= 0:
+        raise LayoutError("The elements are larger than the screen")
+    r = max(r, np.sqrt(POISSON_DENSITY * w * h / (2 * n)))
+    points = poisson_disc(w, h, r, rng)
+    if len(points) < n:
+        raise LayoutError(
+            f"Only {len(points)} of {n} elements fit on the screen with a "
+            f"minimum distance of {r:g} px")
+    return points[rng.choice(len(points), size=n, replace=False)] + margin
+
+
+def uniform_positions(n, width, height, rng, **kwargs):
+    """Draw n positions uniformly from the whole screen."""
+    return rng.uniform(0, (width, height), (n, 2))
+
+
+LAYOUTS = {
+    "grid": grid_positions,
+    "scatter": scatter_positions,
+    "poisson": poisson_positions,
+}
+
+# Layouts whose positions depend on the sprite size
+SIZED_LAYOUTS = {"poisson"}
+
+
+def generate_positions(settings, n, width, height, rng=None, sprite_size=0):
+    """
+    Generate the positions of n elements.
+
+    Args:
+        settings (dict): Parsed location settings. Unknown or missing modes
+            fall back to uniform placement on the screen.
+        n (int): Number of elements.
+        width (int): Screen width.
+        height (int): Screen height.
+        rng (numpy.random.Generator): Random generator, see make_rng().
+        sprite_size (float): Size of the largest element image, used by
+            layouts that keep elements apart.
+
+    Returns:
+        numpy.ndarray: Array of shape (n, 2) with x and y coordinates.
+    """
+    if rng is None:
+        rng = make_rng()
+    params = dict(settings)
+    layout = LAYOUTS.get(params.pop("mode", None), uniform_positions)
+    params["sprite_size"] = sprite_size
+    return layout(n, width, height, rng, **params)
@@ -0,0 +1,204 @@
+"""
+Live preview of a sample layout of the item in the editor.
+"""
+
+from qtpy import QtCore, QtGui, QtWidgets
+
+from .background_helpers import parse_background
+from .element_schema import compile_elements
+from .layout_helpers import parse_location_settings, generate_positions, make_rng
+from .thumbnail_cache import thumbnail_cache
+
+# Seed of unseeded layouts, so that elements move instead of jumping
+# around while the location settings are edited
+PREVIEW_SEED = 0
+PREVIEW_HEIGHT = 200
+
+
+class _Signals(QtCore.QObject):
+    # Emitted from the worker thread, delivered on the GUI thread
+    done = QtCore.Signal(object)
+
+
+class _LayoutTask(QtCore.QRunnable):
+    """Generates the sample layout of a set of settings."""
+
+    def __init__(self, settings, pool, signals):
+        super().__init__()
+        self.settings = settings
+        self.pool = pool
+        self.signals = signals
+
+    def run(self):
+        elements, location_settings, width, height, seed = self.settings
+        try:
+            element_types = compile_elements(elements)
+            # Only the image headers are read, for the sprite sizes
+            sizes = {}
+            for et in element_types:
+                if et.image not in sizes:
+                    size = QtGui.QImageReader(
+                        self.pool[et.image] if et.image else '').size()
+                    sizes[et.image] = max(size.width(), size.height(), 0)
+            positions = generate_positions(
+                parse_location_settings(location_settings),
+                sum(et.amount for et in element_types), width, height,
+                make_rng(seed or PREVIEW_SEED), max(sizes.values() or [0]))
+            result = element_types, sizes, positions, None
+        except Exception as e:
+            result = (), {}, None, str(e)
+        self.signals.done.emit(result)
+
+
+class LayoutPreview(QtWidgets.QGraphicsView):
+    """
+    Shows a sample layout of the elements in a QGraphicsScene, scaled to fit.
+
+    Layouts are generated by a task on the global QThreadPool, so the
+    editor stays responsive with thousands of elements. Only one task runs
+    at a time: settings that change while it runs are kept and generated
+    next, and intermediate settings are skipped. Each element is a
+    QGraphicsPixmapItem with the cached thumbnail of its image, scaled to
+    the size of the image. Items are kept and moved to the new positions;
+    they are only added when there are more elements than before, and
+    hidden when there are fewer.
+
+    Parameters
+    ----------
+    plugin : VisualForaging
+        The item, for the file pool, the display size, the background and
+        the layout seed.
+    """
+
+    def __init__(self, plugin, parent=None):
+        super().__init__(parent)
+        self.plugin = plugin
+        self.setScene(QtWidgets.QGraphicsScene(self))
+        # Items move on every update, so an index would only be rebuilt
+        self.scene().setItemIndexMethod(QtWidgets.QGraphicsScene.NoIndex)
+        self.setCacheMode(QtWidgets.QGraphicsView.CacheBackground)
+        self.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setFixedHeight(PREVIEW_HEIGHT)
+
+        self.screen_rect = self.scene().addRect(QtCore.QRectF())
+        self.message = self.scene().addSimpleText("")
+        self.message.setBrush(QtGui.QBrush(QtCore.Qt.white))
+        self.message.setZValue(1)
+
+        self.elements = ''
+        self.location_settings = ''
+        self.items = []
+        # Image of each item, and the pixmap and size of each image
+        self.item_images = []
+        self.pixmaps = {}
+        self.sizes = {}
+        self.placeholder = QtGui.QPixmap(8, 8)
+        self.placeholder.fill(QtCore.Qt.gray)
+
+        self._running = False
+        self._pending = False
+        self._signals = _Signals()
+        self._signals.done.connect(self._done)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update_layout(self, elements=None, location_settings=None):
+        """Generate a new layout, for new elements or location settings."""
+        if elements is not None:
+            self.elements = elements
+        if location_settings is not None:
+            self.location_settings = location_settings
+        if self._running:
+            self._pending = True
+            return
+        self._start()
+
+    def _start(self):
+        var = self.plugin.var
+        settings = (str(self.elements), str(self.location_settings),
+                    int(var.width), int(var.height),
+                    str(var.get('layout_seed', '')).strip())
+        self._running = True
+        QtCore.QThreadPool.globalInstance().start(
+            _LayoutTask(settings, self.plugin.experiment.pool,
+                        self._signals))
+
+    def _done(self, result):
+        self._running = False
+        if self._pending:
+            self._pending = False
+            self._start()
+        element_types, sizes, positions, error = result
+        self._set_screen()
+        self.message.setText(error or "")
+        if error:
+            for item in self.items:
+                item.setVisible(False)
+            return
+        if sizes != self.sizes:
+            # Rescale all items to the new image sizes
+            self.sizes = sizes
+            self.item_images = [None] * len(self.items)
+        images = [et.image for et in element_types for _ in range(et.amount)]
+        while len(self.items) < len(images):
+            item = self.scene().addPixmap(self.placeholder)
+            item.setTransformationMode(QtCore.Qt.SmoothTransformation)
+            self.items.append(item)
+            self.item_images.append(None)
+        for i, (item, image, (x, y)) in enumerate(
+                zip(self.items, images, positions.tolist())):
+            if self.item_images[i] != image:
+                self.item_images[i] = image
+                self._set_pixmap(item, image)
+            item.setPos(x, y)
+            item.setVisible(True)
+        for item in self.items[len(images):]:
+            item.setVisible(False)
+
+    def _set_screen(self):
+        var = self.plugin.var
+        rect = QtCore.QRectF(0, 0, int(var.width), int(var.height))
+        color = QtGui.QColor(parse_background(var.get('background', ''))[0])
+        self.screen_rect.setRect(rect)
+        self.screen_rect.setBrush(QtGui.QBrush(
+            color if color.isValid() else QtCore.Qt.black))
+        self.message.setPos(10, 10)
+        if self.sceneRect() != rect:
+            self.setSceneRect(rect)
+            self.fitInView(rect, QtCore.Qt.KeepAspectRatio)
+
+    # ------------------------------------------------------------------
+    # Thumbnails
+    # ------------------------------------------------------------------
+
+    def _set_pixmap(self, item, image):
+        if image not in self.pixmaps:
+            self.pixmaps[image] = None
+            try:
+                path = self.plugin.experiment.pool[image] if image else None
+            except Exception:
+                path = None
+            if path:
+                thumbnail_cache().request(
+                    path, lambda pix, name=image: self._thumbnail_ready(name,
+                                                                        pix))
+        pixmap = self.pixmaps[image] or self.placeholder
+        item.setPixmap(pixmap)
+        item.setOffset(-pixmap.width() / 2, -pixmap.height() / 2)
+        size = self.sizes.get(image) or 0
+        item.setScale(size / max(pixmap.width(), pixmap.height())
+                      if size else 1)
+
+    def _thumbnail_ready(self, image, pixmap):
+        self.pixmaps[image] = pixmap
+        for item, item_image in zip(self.items, self.item_images):
+            if item_image == image:
+                self._set_pixmap(item, image)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.fitInView(self.sceneRect(), QtCore.Qt.KeepAspectRatio)
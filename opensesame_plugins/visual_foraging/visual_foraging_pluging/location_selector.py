@@ -1,7 +1,10 @@
 from qtpy import QtCore, QtWidgets
+from .change_pipeline import ChangePipeline
 
 class LocationSelector(QtWidgets.QWidget):
     textChanged = QtCore.Signal(str)
+    # Emitted on every edit, before the change reaches the script
+    edited = QtCore.Signal(str)
 
     def __init__(self, plugin, parent=None):
         """
@@ -20,7 +23,7 @@ class LocationSelector(QtWidgets.QWidget):
 
         # Mode combo
         self.mode_combo = QtWidgets.QComboBox()
-        self.mode_combo.addItems(["grid", "scatter"])
+        self.mode_combo.addItems(["grid", "scatter", "poisson"])
         self.mode_combo.editTextChanged.connect(self.plugin.apply_edit_changes)
         h.addWidget(self.mode_combo)
 
@@ -71,80 +74,97 @@ class LocationSelector(QtWidgets.QWidget):
         self.grid_spacing_y.setRange(1, 10000)
         self.grid_spacing_y.setValue(120)
 
-        # Connect changes to update display & plugin
-        widgets_to_connect = [
-            self.mode_combo,
-            self.scatter_mean_x, self.scatter_std_x, self.scatter_mean_y, self.scatter_std_y,
-            self.grid_rows, self.grid_cols,
-            self.grid_jitter_x, self.grid_jitter_y,
-            self.grid_spacing_x, self.grid_spacing_y
-        ]
-        for w in widgets_to_connect:
-            w.valueChanged.connect(self.update_display) if isinstance(w, QtWidgets.QSpinBox) or isinstance(w, QtWidgets.QDoubleSpinBox) else w.currentIndexChanged.connect(self.update_display)
-
+        # --- Poisson controls (minimum distance in sprite sizes) ---
+        self.poisson_spacing = QtWidgets.QDoubleSpinBox()
+        self.poisson_spacing.setRange(0.1, 100)
+        self.poisson_spacing.setSingleStep(0.1)
+        self.poisson_spacing.setValue(1.2)
+
+        # One panel of options per mode, built once and shown as needed
+        self.option_panels = {}
+        for mode, options in [
+            ("grid", [
+                ("Rows:", self.grid_rows), ("Cols:", self.grid_cols),
+                ("Jitter X:", self.grid_jitter_x),
+                ("Jitter Y:", self.grid_jitter_y),
+                ("Spacing X:", self.grid_spacing_x),
+                ("Spacing Y:", self.grid_spacing_y),
+            ]),
+            ("poisson", [
+                ("Min. distance (sprite sizes):", self.poisson_spacing),
+            ]),
+            ("scatter", [
+                ("Mean X:", self.scatter_mean_x), ("Std X:", self.scatter_std_x),
+                ("Mean Y:", self.scatter_mean_y), ("Std Y:", self.scatter_std_y),
+            ]),
+        ]:
+            panel = QtWidgets.QWidget()
+            panel_layout = QtWidgets.QHBoxLayout(panel)
+            panel_layout.setContentsMargins(0, 0, 0, 0)
+            for label, widget in options:
+                panel_layout.addWidget(QtWidgets.QLabel(label))
+                panel_layout.addWidget(widget)
+                widget.valueChanged.connect(self.on_value_changed)
+            self.option_layout.addWidget(panel)
+            self.option_panels[mode] = panel
+        self.mode_combo.currentIndexChanged.connect(self.update_display)
+
+        # Changes reach the script once editing pauses
+        self.changes = ChangePipeline(lambda row: self.text(),
+                                      self.textChanged.emit, parent=self)
         self.textChanged.connect(self.plugin.apply_edit_changes)
 
-        # Initialize display
+        # Initialize display. The defaults are not an edit, so they do not
+        # reach the script
         self.update_display()
+        self.changes.sync(self.text())
 
-    def update_display(self):
-        # Clear current option layout
-        for i in reversed(range(self.option_layout.count())):
-            widget = self.option_layout.itemAt(i).widget()
-            if widget is not None:
-                widget.setParent(None)
+    def on_value_changed(self, value):
+        self.changes.mark()
+        self.edited.emit(self.text())
 
+    def update_display(self):
         mode = self.mode_combo.currentText()
-        if mode == "grid":
-            self.option_layout.addWidget(QtWidgets.QLabel("Rows:"))
-            self.option_layout.addWidget(self.grid_rows)
-            self.option_layout.addWidget(QtWidgets.QLabel("Cols:"))
-            self.option_layout.addWidget(self.grid_cols)
-            self.option_layout.addWidget(QtWidgets.QLabel("Jitter X:"))
-            self.option_layout.addWidget(self.grid_jitter_x)
-            self.option_layout.addWidget(QtWidgets.QLabel("Jitter Y:"))
-            self.option_layout.addWidget(self.grid_jitter_y)
-            self.option_layout.addWidget(QtWidgets.QLabel("Spacing X:"))
-            self.option_layout.addWidget(self.grid_spacing_x)
-            self.option_layout.addWidget(QtWidgets.QLabel("Spacing Y:"))
-            self.option_layout.addWidget(self.grid_spacing_y)
-        else:
-            self.option_layout.addWidget(QtWidgets.QLabel("Mean X:"))
-            self.option_layout.addWidget(self.scatter_mean_x)
-            self.option_layout.addWidget(QtWidgets.QLabel("Std X:"))
-            self.option_layout.addWidget(self.scatter_std_x)
-            self.option_layout.addWidget(QtWidgets.QLabel("Mean Y:"))
-            self.option_layout.addWidget(self.scatter_mean_y)
-            self.option_layout.addWidget(QtWidgets.QLabel("Std Y:"))
-            self.option_layout.addWidget(self.scatter_std_y)
-
-        self.textChanged.emit(self.text())
+        for panel_mode, panel in self.option_panels.items():
+            panel.setVisible(panel_mode == mode)
+        self.changes.mark()
+        self.edited.emit(self.text())
 
     # Serialization for OpenSesame
     def text(self):
         mode = self.mode_combo.currentText()
         if mode == "grid":
             return f"<mode: grid, rows: {self.grid_rows.value()}, cols: {self.grid_cols.value()}, jitter_x: {self.grid_jitter_x.value()}, jitter_y: {self.grid_jitter_y.value()}, spacing_x: {self.grid_spacing_x.value()}, spacing_y: {self.grid_spacing_y.value()}>"
+        elif mode == "poisson":
+            return f"<mode: poisson, spacing: {self.poisson_spacing.value()}>"
         else:
             return f"<mode: scatter, mean_x: {self.scatter_mean_x.value()}, std_x: {self.scatter_std_x.value()}, mean_y: {self.scatter_mean_y.value()}, std_y: {self.scatter_std_y.value()}>"
 
     def setText(self, text):
-            if text.startswith("<") and text.endswith(">"):
-                text = text[1:-1]
-                parts = [p.strip() for p in text.split(",")]
-                mode_part = parts[0].split(":")[1].strip()
-                self.mode_combo.setCurrentText(mode_part)
-                if mode_part == "grid":
-                    self.grid_rows.setValue(int(parts[1].split(":")[1]))
-                    self.grid_cols.setValue(int(parts[2].split(":")[1]))
-                    self.grid_jitter_x.setValue(int(parts[3].split(":")[1]))
-                    self.grid_jitter_y.setValue(int(parts[4].split(":")[1]))
-                    self.grid_spacing_x.setValue(int(parts[5].split(":")[1]))
-                    self.grid_spacing_y.setValue(int(parts[6].split(":")[1]))
-                else:
-                    self.scatter_mean_x.setValue(float(parts[1].split(":")[1]))
-                    self.scatter_std_x.setValue(float(parts[2].split(":")[1]))
-                    self.scatter_mean_y.setValue(float(parts[3].split(":")[1]))
-                    self.scatter_std_y.setValue(float(parts[4].split(":")[1]))
+            # Only report a change if the text ends up different from the
+            # script. Empty settings are kept rather than replaced by the
+            # defaults of the widget
+            if not (text.startswith("<") and text.endswith(">")):
+                self.changes.sync(self.text())
+                return
+            self.changes.sync(text)
+            text = text[1:-1]
+            parts = [p.strip() for p in text.split(",")]
+            mode_part = parts[0].split(":")[1].strip()
+            self.mode_combo.setCurrentText(mode_part)
+            if mode_part == "grid":
+                self.grid_rows.setValue(int(parts[1].split(":")[1]))
+                self.grid_cols.setValue(int(parts[2].split(":")[1]))
+                self.grid_jitter_x.setValue(int(parts[3].split(":")[1]))
+                self.grid_jitter_y.setValue(int(parts[4].split(":")[1]))
+                self.grid_spacing_x.setValue(int(parts[5].split(":")[1]))
+                self.grid_spacing_y.setValue(int(parts[6].split(":")[1]))
+            elif mode_part == "poisson":
+                self.poisson_spacing.setValue(float(parts[1].split(":")[1]))
+            else:
+                self.scatter_mean_x.setValue(float(parts[1].split(":")[1]))
+                self.scatter_std_x.setValue(float(parts[2].split(":")[1]))
+                self.scatter_mean_y.setValue(float(parts[3].split(":")[1]))
+                self.scatter_std_y.setValue(float(parts[4].split(":")[1]))
             self.update_display()
 
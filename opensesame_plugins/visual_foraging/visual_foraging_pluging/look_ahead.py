@@ -0,0 +1,145 @@
+"""
+Preparation of trials, optionally one trial ahead on a worker thread.
+"""
+
+import queue
+import threading
+import warnings
+from typing import NamedTuple
+
+import numpy as np
+import pygame
+
+from .element_schema import compile_elements
+from .event_log import load_event_log
+from .image_cache import image_cache
+from .layout_bank import open_layout_bank, layout_hash
+from .layout_helpers import parse_location_settings, generate_positions, make_rng
+
+
+class TrialSettings(NamedTuple):
+    """
+    Everything the layout of a trial depends on. Read from the item's
+    variables on the main thread; a trial prepared ahead is only used if
+    its settings equal those of the trial that is actually prepared.
+    """
+    elements: str
+    location_settings: str
+    width: int
+    height: int
+    seed: str
+    trial: int
+    layout_bank: str = ''
+    replay_log: str = ''
+
+
+class PreparedTrial(NamedTuple):
+    settings: TrialSettings
+    element_types: tuple
+    # Image file name -> (pool path, decoded surface or None if cached)
+    images: dict
+    layout_hash: str
+    positions: np.ndarray
+    replay_log: dict
+
+
+def prepare_trial(settings, pool):
+    """
+    Parse the elements, decode the images that are not cached yet and
+    generate the layout of a trial. Touches neither the display nor the
+    item, so it may run on a worker thread.
+    """
+    element_types = compile_elements(settings.elements)
+    images = {}
+    sizes = []
+    for et in element_types:
+        if et.image in images:
+            continue
+        path = pool[et.image]
+        cached = image_cache.peek(path)
+        surface = pygame.image.load(path) if cached is None else None
+        images[et.image] = (path, surface)
+        sizes.append(max((cached or surface).get_size()))
+
+    # Elements are kept apart relative to the largest image
+    sprite_size = max(sizes or [0])
+    h = layout_hash(element_types, settings.location_settings,
+                    settings.width, settings.height, sprite_size,
+                    settings.seed)
+    positions = None
+    replay_log = None
+    if settings.replay_log:
+        # A replay uses the recorded layout, also for unseeded layouts
+        replay_log = load_event_log(settings.replay_log)
+        if str(replay_log['layout_hash']) != h:
+            warnings.warn("Replaying %s with different elements or location "
+                          "settings than were recorded" % settings.replay_log)
+        positions = replay_log['positions']
+    elif settings.layout_bank:
+        bank = open_layout_bank(settings.layout_bank, h)
+        if bank is not None:
+            positions = bank.positions(settings.trial)
+    if positions is None:
+        positions = generate_positions(
+            parse_location_settings(settings.location_settings),
+            sum(et.amount for et in element_types), settings.width,
+            settings.height, make_rng(settings.seed, settings.trial),
+            sprite_size)
+    return PreparedTrial(settings, element_types, images, h, positions,
+                         replay_log)
+
+
+class LookAhead:
+    """
+    Prepares trials on a worker thread.
+
+    ``submit()`` queues the settings of an upcoming trial and returns
+    immediately; ``take()`` hands over the prepared trial. Both queues are
+    bounded by ``depth``, so the worker never runs further ahead than that.
+
+    Parameters
+    ----------
+    depth : int
+        Maximum number of trials prepared ahead.
+    """
+
+    def __init__(self, depth=1):
+        self.depth = depth
+        self.requests = queue.Queue(maxsize=depth)
+        self.results = queue.Queue(maxsize=depth)
+        self.pending = 0
+        self._thread = None
+
+    def _work(self):
+        while True:
+            settings, pool = self.requests.get()
+            try:
+                result = prepare_trial(settings, pool)
+            except Exception as e:
+                # Preparing the trial again on the main thread raises it
+                result = e
+            self.results.put(result)
+
+    def submit(self, settings, pool):
+        """Start preparing a trial, unless depth trials are pending."""
+        if self.pending >= self.depth:
+            return
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+        self.requests.put((settings, pool))
+        self.pending += 1
+
+    def take(self, settings):
+        """
+        Return the prepared trial with these settings, waiting for it if it
+        is not finished yet, or None if no such trial was submitted. Trials
+        prepared for other settings are discarded.
+        """
+        while self.pending:
+            result = self.results.get()
+            self.pending -= 1
+            if isinstance(result, PreparedTrial) \
+                    and result.settings == settings:
+                return result
+        return None
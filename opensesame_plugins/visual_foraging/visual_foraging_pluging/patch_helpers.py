@@ -1,20 +1,57 @@
 from .serialization_helpers import deserialize_elements
 from random import randint
+from .element_store import ElementStore
+from .element_schema import ElementType, as_element_type
+import numpy as np
 
 
 def get_element_instances(elements, positions=None):
-        element_types = elements
+        element_types = [as_element_type(et).to_dict() for et in elements]
         element_instances = []
         for et in element_types:
-            for i in range(0, int(et['amount'])):
+            for i in range(0, et['amount']):
                 instance = {}
                 for k in et.keys():
                     if k != 'amount':
                         instance[k] = et[k]
  
-                instance['x'] = randint(0, 800)
-                instance['y'] = randint(0, 800)
+                if positions is None:
+                    instance['x'] = randint(0, 800)
+                    instance['y'] = randint(0, 800)
+                else:
+                    x, y = positions[len(element_instances)]
+                    instance['x'] = float(x)
+                    instance['y'] = float(y)
                 element_instances.append(instance)
         
         return(element_instances)
 
+
+
+def get_element_store(elements, positions=None):
+        """
+        Build an ElementStore for the element types without creating a dict
+        per instance. Each type's fields are interned once and repeated
+        `amount` times.
+        """
+        element_types = [as_element_type(et).to_dict() for et in elements]
+        amounts = [et['amount'] for et in element_types]
+        n = sum(amounts)
+        
+        codes, strings = {}, {}
+        for k in ElementType._fields:
+            if k in ElementStore.NUMERIC_FIELDS or k == 'amount':
+                continue
+            column = [et[k] for et in element_types]
+            strings[k] = list(dict.fromkeys(column))
+            codes[k] = np.repeat(
+                [strings[k].index(v) for v in column], amounts)
+        values = np.repeat([et['value'] for et in element_types], amounts)
+        
+        if positions is None:
+            x = np.random.randint(0, 801, n)
+            y = np.random.randint(0, 801, n)
+        else:
+            x, y = np.asarray(positions, dtype=float).reshape(n, 2).T
+        
+        return ElementStore(x, y, values, codes, strings)
@@ -0,0 +1,172 @@
+"""
+Renderers that draw the element store onto the pygame display.
+"""
+
+import numpy as np
+import pygame
+
+from .atlas_helpers import build_atlas
+
+RENDER_MODES = ('full redraw', 'dirty rectangles', 'sprite atlas')
+
+
+class FullRenderer:
+    """
+    Blits the background and every live element and flips the display on
+    every frame.
+
+    Parameters
+    ----------
+    screen : pygame.Surface
+        The display surface.
+    background : pygame.Surface
+        Background layer of the size of the screen, see background_layer().
+    images : list of pygame.Surface
+        Element images, indexed by the store's image codes.
+    store : ElementStore
+        The element instances to draw.
+    """
+
+    def __init__(self, screen, background, images, store):
+        self.screen = screen
+        self.background = background
+        self.images = images
+        self.store = store
+
+    def _position(self, i, img):
+        return (int(self.store.x[i] - img.get_width() / 2),
+                int(self.store.y[i] - img.get_height() / 2))
+
+    def _blit(self, i):
+        img = self.images[self.store.codes['image'][i]]
+        return self.screen.blit(img, self._position(i, img))
+
+    def draw_scene(self):
+        self.screen.blit(self.background, (0, 0))
+        for i in self.store.live_ids():
+            self._blit(i)
+
+    def render(self):
+        """
+        Draw the next frame into the display surface without showing it.
+        Returns the rectangles present() has to push, True for the whole
+        screen, or None if nothing changed.
+        """
+        self.draw_scene()
+        return True
+
+    def present(self, update):
+        """Show what render() returned."""
+        if update is True:
+            pygame.display.flip()
+        else:
+            pygame.display.update(update)
+
+    def vanish(self, i):
+        """Called after element ``i`` has been removed from the store."""
+        pass
+
+
+class DirtyRectRenderer(FullRenderer):
+    """
+    Draws the full scene once and afterwards only repaints the regions of
+    vanished elements.
+
+    When an element vanishes its rectangle is restored from the background
+    layer, the live elements that overlap it are blitted again, and only
+    the changed rectangles are pushed with ``pygame.display.update``.
+
+    Parameters
+    ----------
+    spatial_index : SpatialIndex
+        Index over the store, used to find elements overlapping a repainted
+        rectangle.
+    """
+
+    def __init__(self, screen, background, images, store, spatial_index):
+        super().__init__(screen, background, images, store)
+        self.spatial_index = spatial_index
+        self.max_extent = max(
+            [np.hypot(*img.get_size()) / 2 for img in images] or [0])
+        self.dirty = []
+        self.drawn = False
+
+    def render(self):
+        if not self.drawn:
+            self.draw_scene()
+            self.drawn = True
+            self.dirty = []
+            return True
+        if not self.dirty:
+            return None
+        for rect in self.dirty:
+            self.screen.blit(self.background, rect, rect)
+            self.screen.set_clip(rect)
+            radius = np.hypot(rect.w, rect.h) / 2 + self.max_extent
+            for j in np.sort(self.spatial_index.candidates(
+                    rect.centerx, rect.centery, radius)):
+                self._blit(j)
+            self.screen.set_clip(None)
+        update, self.dirty = self.dirty, []
+        return update
+
+    def vanish(self, i):
+        img = self.images[self.store.codes['image'][i]]
+        rect = img.get_rect(topleft=self._position(i, img))
+        self.dirty.append(rect.clip(self.screen.get_rect()))
+
+
+class AtlasRenderer(FullRenderer):
+    """
+    Redraws the full scene on every frame, like FullRenderer, but blits all
+    elements with a single ``Surface.blits()`` call from an atlas of the
+    element images.
+
+    The blit sequence of the live elements is built once from the
+    destination arrays of the store and kept in element order; a vanished
+    element's entry is dropped from it.
+    """
+
+    def __init__(self, screen, background, images, store):
+        super().__init__(screen, background, images, store)
+        self.atlas, rects = build_atlas(images)
+        codes = store.codes['image']
+        w = np.array([r.w for r in rects], dtype=float)[codes]
+        h = np.array([r.h for r in rects], dtype=float)[codes]
+        # Truncated like _position()
+        left = (store.x - w / 2).astype(int).tolist()
+        top = (store.y - h / 2).astype(int).tolist()
+        self.sequence = {
+            i: (self.atlas, (left[i], top[i]), rects[codes[i]])
+            for i in store.live_ids().tolist()
+        }
+
+    def draw_scene(self):
+        self.screen.blit(self.background, (0, 0))
+        self.screen.blits(iter(self.sequence.values()), doreturn=False)
+
+    def vanish(self, i):
+        self.sequence.pop(i, None)
+
+
+class NullRenderer:
+    """Stands in for a renderer when nothing is shown, e.g. fast replays."""
+
+    def render(self):
+        return None
+
+    def present(self, update):
+        pass
+
+    def vanish(self, i):
+        pass
+
+
+def get_renderer(mode, screen, background, images, store, spatial_index):
+    """Return the renderer for one of the RENDER_MODES."""
+    if mode == 'sprite atlas':
+        return AtlasRenderer(screen, background, images, store)
+    if mode == 'dirty rectangles':
+        return DirtyRectRenderer(screen, background, images, store,
+                                 spatial_index)
+    return FullRenderer(screen, background, images, store)
@@ -0,0 +1,80 @@
+"""
+Replay of recorded trials from their event logs.
+"""
+
+import time
+
+import numpy as np
+
+from .event_log import INPUT_KINDS
+from .input_helpers import InputEvent
+from .timing_helpers import now
+
+
+class ReplayPump:
+    """
+    Stands in for EventPump and returns the events of a recorded trial.
+
+    In real time, ``poll()`` returns the events whose recorded time since
+    onset has passed. Otherwise the first poll returns all of them, so a
+    trial is replayed as fast as check_clicked() can process the events.
+    Event times are mapped back onto the clock of ``timing``, so that
+    ``timing.rt(event.time)`` gives the recorded time.
+
+    Parameters
+    ----------
+    log : dict
+        Event log as returned by load_event_log().
+    timing : TrialTiming
+        Timing of the replayed trial.
+    realtime : bool
+        Whether to release the events at their recorded times.
+    """
+
+    def __init__(self, log, timing, realtime=False):
+        self.time = log['time']
+        self.x = log['x']
+        self.y = log['y']
+        self.input = log['input']
+        self.timing = timing
+        self.realtime = realtime
+        self.next = 0
+
+    @property
+    def exhausted(self):
+        return self.next >= len(self.time)
+
+    def wait(self, deadline):
+        """Sleep until ``deadline``, on the ``now()`` clock."""
+        remaining = deadline - now()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def poll(self):
+        if self.realtime:
+            end = int(np.searchsorted(self.time, self.timing.rt(now()),
+                                      side='right'))
+        else:
+            end = len(self.time)
+        at = self.timing.at
+        events = [
+            InputEvent(INPUT_KINDS[code], x, y, 1, at(t))
+            for code, x, y, t in zip(
+                self.input[self.next:end].tolist(),
+                self.x[self.next:end].tolist(),
+                self.y[self.next:end].tolist(),
+                self.time[self.next:end].tolist())
+        ]
+        self.next = end
+        return events
+
+
+def count_mismatches(recorded, replayed):
+    """
+    Return the number of events whose outcome (the 'element' column of
+    EventLog) differs between two event logs. Events missing from either
+    log count as mismatches.
+    """
+    a, b = recorded['element'], replayed['element']
+    n = min(len(a), len(b))
+    return int(np.count_nonzero(a[:n] != b[:n])) + abs(len(a) - len(b))
@@ -1,4 +1,37 @@
 import json
+from functools import lru_cache
+
+# Braces inside strings are written as JSON unicode escapes, so that the
+# only angle braces in the serialized text are structural
+_STRING_ESCAPES = str.maketrans({
+    "<": "\\u003c", ">": "\\u003e", "{": "\\u007b", "}": "\\u007d"
+})
+_ENCODE = str.maketrans("{}", "<>")
+_DECODE = str.maketrans("<>", "{}")
+
+# Stand-ins for escaped backslashes and quotes while splitting at quotes.
+# Raw control characters cannot occur in valid JSON text.
+_BACKSLASH, _QUOTE = "\x00", "\x01"
+
+
+def _translate(text, outside, inside=None):
+    """
+    Translate the characters of JSON text outside of string literals with
+    the table outside, and those inside with the table inside, in a single
+    scan. Escaped characters are swapped out first, so that every remaining
+    quote delimits a string literal.
+    """
+    if "\\" in text:
+        text = text.replace("\\\\", _BACKSLASH).replace('\\"', _QUOTE)
+    parts = text.split('"')
+    parts[::2] = [p.translate(outside) for p in parts[::2]]
+    if inside is not None:
+        parts[1::2] = [p.translate(inside) for p in parts[1::2]]
+    text = '"'.join(parts)
+    if _BACKSLASH in text or _QUOTE in text:
+        text = text.replace(_QUOTE, '\\"').replace(_BACKSLASH, "\\\\")
+    return text
+
 
 def serialize_elements(elements):
     """
@@ -17,11 +50,44 @@ def serialize_elements(elements):
     lines = []
     for element in elements:
         j = json.dumps(element)
-        j = j.replace("{", "<").replace("}", ">")
-        lines.append(j)
+        lines.append(_translate(j, _ENCODE, _STRING_ESCAPES))
     return "\n".join(lines)
 
 
+def _decode_line(line):
+    """Turn one angle-brace element line into JSON."""
+    inner = line[1:-1]
+    # A flat element has angle braces only at both ends
+    if line[:1] == "<" and line[-1:] == ">" \
+            and "<" not in inner and ">" not in inner:
+        return "{" + inner + "}"
+    # Otherwise angle braces outside of string literals are structural, and
+    # everything inside a string literal, including < and >, is kept as is
+    return _translate(line, _DECODE)
+
+
+@lru_cache(maxsize=64)
+def parse_elements(text):
+    """
+    Parse serialized elements into a tuple of dicts. Results are cached by
+    text and shared, so they must not be modified.
+    """
+    lines = [_decode_line(line.strip())
+             for line in text.splitlines() if line.strip()]
+    try:
+        return tuple(json.loads("[" + ",".join(lines) + "]"))
+    except ValueError:
+        pass
+    # Parse line by line to skip only the malformed lines
+    result = []
+    for line in lines:
+        try:
+            result.append(json.loads(line))
+        except Exception as e:
+            print("Failed to parse element:", e)
+    return tuple(result)
+
+
 def deserialize_elements(text):
     """
     Deserialize OpenSesame-safe angle-brace formatted string into a list of dicts.
@@ -32,19 +98,22 @@ def deserialize_elements(text):
     Returns:
         list of dict: Parsed element dictionaries.
     """
-    result = []
     if not text:
-        return result
+        return []
 
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    for line in lines:
-        try:
-            j = line.replace("<", "{").replace(">", "}")
-            element = json.loads(j)
-            result.append(element)
-        except Exception as e:
-            print("Failed to parse element:", e)
-    if len(result) == 1:
-        return result[0]
-    return result
+    return [dict(element) if isinstance(element, dict) else element
+            for element in parse_elements(str(text))]
 
+
+def deserialize_element(text):
+    """
+    Deserialize a single angle-brace formatted dict.
+
+    Args:
+        text (str): Serialized element string.
+
+    Returns:
+        dict: The first element, or an empty dict if there is none.
+    """
+    elements = deserialize_elements(text)
+    return elements[0] if elements else {}
@@ -0,0 +1,123 @@
+"""
+Preloaded click sounds played on a fixed pool of mixer channels.
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pygame
+
+from .timing_helpers import now
+
+
+class SoundBank:
+    """
+    Decoded sounds, shared by all items and trials of the experiment.
+
+    Sounds are decoded into ``pygame.mixer.Sound`` objects by ``load()``,
+    keyed by file path and modification time, so the frame loop only ever
+    starts playback. Playback rotates over a pool of mixer channels that
+    are added to the mixer and reserved, so a click never waits for a free
+    channel and never cuts off sounds that OpenSesame plays on the
+    channels the mixer had before. The delay from the timestamp of an
+    input event until ``Channel.play()`` returned is kept in a preallocated
+    array. It does not include the mixer buffer or the output latency of
+    the audio device, so it is not the time until the sound is heard.
+
+    Parameters
+    ----------
+    n_channels : int
+        Number of mixer channels reserved for click sounds.
+    capacity : int
+        Maximum number of play delays recorded per trial.
+    """
+
+    def __init__(self, n_channels=8, capacity=4096):
+        self.n_channels = n_channels
+        self.channels = []
+        self.next_channel = 0
+        self.buffer = None
+        self.frequency = None
+        self.delays = np.zeros(capacity)
+        self.count = 0
+        self._sounds = {}
+
+    def init(self, frequency=48000, size=-16, channels=2, buffer=1024):
+        """
+        Add the channels of the pool to the experiment's mixer and reserve
+        them. The mixer is shared with OpenSesame's samplers, so it is never
+        restarted; it is only started, with the experiment's sound settings,
+        if nothing started it yet. ``buffer`` is the experiment's sound_buf_size, used to report
+        the buffer latency. Returns False if there is no audio device.
+        """
+        if pygame.mixer.get_init() is None:
+            try:
+                pygame.mixer.init(frequency, size, channels, buffer)
+            except pygame.error as e:
+                warnings.warn("Click sounds are disabled: %s" % e)
+                return False
+            # Sounds and channels belong to a previous mixer
+            self._sounds.clear()
+            self.channels = []
+        self.buffer = buffer
+        self.frequency = pygame.mixer.get_init()[0]
+        if not self.channels:
+            # Reserved channels are always the lowest ones, so the mixer
+            # grows by the pool and keeps as many free channels as before
+            pygame.mixer.set_num_channels(
+                pygame.mixer.get_num_channels() + self.n_channels)
+            pygame.mixer.set_reserved(self.n_channels)
+            self.channels = [pygame.mixer.Channel(i)
+                             for i in range(self.n_channels)]
+        return True
+
+    def load(self, path):
+        """Return the decoded sound of the file at ``path``."""
+        key = (path, os.path.getmtime(path))
+        sound = self._sounds.get(key)
+        if sound is None:
+            for stale in [k for k in self._sounds if k[0] == path]:
+                del self._sounds[stale]
+            sound = self._sounds[key] = pygame.mixer.Sound(path)
+        return sound
+
+    def play(self, sound, t=None):
+        """
+        Start playing a decoded sound on the next channel of the pool. ``t``
+        is the time of the input event on the ``timing_helpers.now()``
+        clock, used to record the play delay.
+        """
+        channel = self.channels[self.next_channel]
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+        channel.play(sound)
+        if t is not None:
+            if self.count < len(self.delays):
+                self.delays[self.count] = now() - t
+            self.count += 1
+
+    def reset_stats(self):
+        self.count = 0
+
+    def summary(self):
+        """
+        Return the mean and max delay from the input event until
+        ``Channel.play()`` returned, and the latency of the mixer buffer,
+        in ms. The sound is heard after both, plus the output latency of
+        the audio device.
+        """
+        d = self.delays[:min(self.count, len(self.delays))] * 1000
+        if not len(d):
+            d = np.zeros(1)
+        buffer_latency = self.buffer / self.frequency * 1000 \
+            if self.buffer and self.frequency else None
+        return {
+            'sound_count': self.count,
+            'sound_play_delay_mean': float(d.mean()),
+            'sound_play_delay_max': float(d.max()),
+            'sound_buffer_latency': buffer_latency,
+        }
+
+
+# Shared by all items and trials of the experiment
+sound_bank = SoundBank()
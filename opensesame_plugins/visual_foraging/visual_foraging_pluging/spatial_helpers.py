@@ -0,0 +1,149 @@
+"""
+Uniform-grid spatial index for hit-testing element instances.
+"""
+
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+
+class SpatialIndex:
+    """
+    Uniform grid over element positions that answers nearest-element queries.
+
+    Elements are bucketed into square cells of ``cell_size`` pixels and kept
+    in one cell-sorted array, so building the index takes a few vectorized
+    NumPy calls and a query only looks at the cells overlapping the search
+    radius. Elements are removed by clearing their ``alive`` flag.
+
+    ``nearest()`` is called for every input event, so when the cells hold
+    at most ``SCAN_LIMIT`` elements it scans them in plain Python, which
+    avoids the fixed cost of several small NumPy calls per query.
+
+    Parameters
+    ----------
+    x, y : array-like
+        Element positions. The position in these arrays is the element id.
+    cell_size : float
+        Edge length of a grid cell in pixels. Using the click radius means a
+        query never looks at more than 3x3 cells.
+    alive : numpy.ndarray, optional
+        Boolean array of live elements. Passing the ``alive`` array of an
+        ElementStore lets the index follow vanished elements without being
+        told about them.
+    """
+
+    SCAN_LIMIT = 64
+
+    def __init__(self, x, y, cell_size, alive=None):
+        self.x = np.asarray(x, dtype=float)
+        self.y = np.asarray(y, dtype=float)
+        self.cell_size = float(max(cell_size, 1))
+        if alive is None:
+            alive = np.ones(len(self.x), dtype=bool)
+        self.alive = alive
+
+        if len(self.x):
+            self.origin_x = self.x.min()
+            self.origin_y = self.y.min()
+            cx = ((self.x - self.origin_x) // self.cell_size).astype(np.int64)
+            cy = ((self.y - self.origin_y) // self.cell_size).astype(np.int64)
+            self.n_cols = int(cx.max()) + 1
+            self.n_rows = int(cy.max()) + 1
+            keys = cy * self.n_cols + cx
+        else:
+            self.origin_x = self.origin_y = 0.0
+            self.n_cols = self.n_rows = 0
+            keys = np.empty(0, dtype=np.int64)
+
+        self.order = np.argsort(keys, kind='stable')
+        self.keys = keys[self.order]
+
+        # Plain lists for nearest()
+        self._keys = self.keys.tolist()
+        self._order = self.order.tolist()
+        self._x = self.x.tolist()
+        self._y = self.y.tolist()
+
+    def __len__(self):
+        return int(np.count_nonzero(self.alive))
+
+    def _cell_range(self, lo, hi, origin, count):
+        first = max(int((lo - origin) // self.cell_size), 0)
+        last = min(int((hi - origin) // self.cell_size), count - 1)
+        return first, last
+
+    def candidates(self, x, y, radius, accept=None):
+        """
+        Return the ids of live elements in the cells overlapping the circle
+        around (x, y). The result is a superset of the elements within
+        ``radius``. If ``accept`` is given, only ids for which this boolean
+        array is True are returned.
+        """
+        if not len(self.keys):
+            return self.order[:0]
+        cx0, cx1 = self._cell_range(x - radius, x + radius,
+                                    self.origin_x, self.n_cols)
+        cy0, cy1 = self._cell_range(y - radius, y + radius,
+                                    self.origin_y, self.n_rows)
+        if cx0 > cx1 or cy0 > cy1:
+            return self.order[:0]
+        rows = np.arange(cy0, cy1 + 1) * self.n_cols
+        starts = np.searchsorted(self.keys, rows + cx0, side='left')
+        stops = np.searchsorted(self.keys, rows + cx1, side='right')
+        ids = np.concatenate(
+            [self.order[a:b] for a, b in zip(starts, stops)])
+        ids = ids[self.alive[ids]]
+        if accept is not None:
+            ids = ids[accept[ids]]
+        return ids
+
+    def nearest(self, x, y, radius, accept=None):
+        """
+        Return the id of the live element closest to (x, y), or None if no
+        element lies within ``radius``. Ties go to the lowest id, which
+        matches a linear scan over the original instance list. ``accept``
+        restricts the search as in ``candidates()``.
+        """
+        if not len(self.keys):
+            return None
+        cx0, cx1 = self._cell_range(x - radius, x + radius,
+                                    self.origin_x, self.n_cols)
+        cy0, cy1 = self._cell_range(y - radius, y + radius,
+                                    self.origin_y, self.n_rows)
+        # Cells of a row of the grid are contiguous in the sorted keys
+        keys = self._keys
+        spans = []
+        n = 0
+        for cy in range(cy0, cy1 + 1):
+            row = cy * self.n_cols
+            start = bisect_left(keys, row + cx0)
+            stop = bisect_right(keys, row + cx1, start)
+            if start < stop:
+                spans.append((start, stop))
+                n += stop - start
+        if n <= self.SCAN_LIMIT:
+            return self._scan(spans, x, y, radius, accept)
+
+        ids = self.candidates(x, y, radius, accept)
+        if not len(ids):
+            return None
+        d2 = (self.x[ids] - x) ** 2 + (self.y[ids] - y) ** 2
+        best = d2.min()
+        if best > radius * radius:
+            return None
+        return int(ids[d2 == best].min())
+
+    def _scan(self, spans, x, y, radius, accept):
+        best = None
+        best_d2 = radius * radius
+        order, xs, ys, alive = self._order, self._x, self._y, self.alive
+        for start, stop in spans:
+            for i in order[start:stop]:
+                if not alive[i] or (accept is not None and not accept[i]):
+                    continue
+                d2 = (xs[i] - x) ** 2 + (ys[i] - y) ** 2
+                if d2 < best_d2 or (d2 == best_d2
+                                    and (best is None or i < best)):
+                    best, best_d2 = i, d2
+        return best
@@ -0,0 +1,123 @@
+"""
+Thumbnails of pool images for the editor, cached in memory and on disk and
+decoded on a thread pool.
+"""
+
+import hashlib
+import os
+import tempfile
+
+from qtpy import QtCore, QtGui
+
+
+class _Signals(QtCore.QObject):
+    # Emitted from the worker threads, delivered on the GUI thread
+    done = QtCore.Signal(object, object)
+
+
+class _ThumbnailTask(QtCore.QRunnable):
+
+    def __init__(self, key, cache_file, signals):
+        super().__init__()
+        self.key = key
+        self.cache_file = cache_file
+        self.signals = signals
+
+    def run(self):
+        path, mtime, size = self.key
+        image = QtGui.QImage()
+        if not (self.cache_file and image.load(self.cache_file)):
+            image = QtGui.QImage(path)
+            if not image.isNull():
+                image = image.scaled(size, size,
+                                     QtCore.Qt.KeepAspectRatio,
+                                     QtCore.Qt.SmoothTransformation)
+                if self.cache_file:
+                    image.save(self.cache_file, 'PNG')
+        self.signals.done.emit(self.key, image)
+
+
+class ThumbnailCache(QtCore.QObject):
+    """
+    Scaled-down icons of image files.
+
+    Thumbnails are keyed by file path, modification time and size. A
+    thumbnail in memory is handed out right away. Otherwise it is read from
+    the disk cache, or decoded and scaled and then written to the disk
+    cache, by a task on the global QThreadPool, and the callback is called
+    on the GUI thread once it is ready.
+
+    Parameters
+    ----------
+    size : int
+        Edge length of the thumbnails in pixels.
+    folder : str, optional
+        Disk cache folder. None for a folder in the temporary directory,
+        '' to keep thumbnails in memory only.
+    """
+
+    def __init__(self, size=32, folder=None):
+        super().__init__()
+        self.size = size
+        if folder is None:
+            folder = os.path.join(tempfile.gettempdir(),
+                                  'visual_foraging_thumbnails')
+        self.folder = folder
+        self._pixmaps = {}
+        self._pending = {}
+        self._signals = _Signals()
+        self._signals.done.connect(self._done)
+
+    def _cache_file(self, key):
+        if not self.folder:
+            return None
+        os.makedirs(self.folder, exist_ok=True)
+        name = hashlib.sha1(repr(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.folder, name + '.png')
+
+    def request(self, path, callback):
+        """
+        Call ``callback(pixmap)`` with the thumbnail of the image at path,
+        immediately if it is in memory and otherwise once it is loaded.
+        Nothing is called for files that cannot be read.
+        """
+        try:
+            key = (path, os.path.getmtime(path), self.size)
+        except OSError:
+            return
+        pixmap = self._pixmaps.get(key)
+        if pixmap is not None:
+            callback(pixmap)
+            return
+        if key in self._pending:
+            self._pending[key].append(callback)
+            return
+        self._pending[key] = [callback]
+        QtCore.QThreadPool.globalInstance().start(
+            _ThumbnailTask(key, self._cache_file(key), self._signals))
+
+    def _done(self, key, image):
+        callbacks = self._pending.pop(key, [])
+        if image.isNull():
+            return
+        for stale in [k for k in self._pixmaps if k[0] == key[0]]:
+            del self._pixmaps[stale]
+        # Pixmaps can only be made on the GUI thread
+        pixmap = self._pixmaps[key] = QtGui.QPixmap.fromImage(image)
+        for callback in callbacks:
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                # The widget that asked for it was deleted in the meantime
+                pass
+
+
+_thumbnail_cache = None
+
+
+def thumbnail_cache():
+    """Return the thumbnail cache shared by all editor widgets."""
+    global _thumbnail_cache
+    if _thumbnail_cache is None:
+        _thumbnail_cache = ThumbnailCache()
+    return _thumbnail_cache
@@ -0,0 +1,156 @@
+"""
+High-resolution timing of trial onset, frames and input events.
+"""
+
+import time
+
+import numpy as np
+
+# Monotonic high-resolution clock (seconds) used for all input timing
+now = time.perf_counter
+
+
+# Stages of the frame loop timed by TrialTiming.lap()
+POLL, HIT_TEST, DRAW, FLIP = range(4)
+STAGES = ('poll', 'hit_test', 'draw', 'flip')
+
+
+class TrialTiming:
+    """
+    Timestamps of one trial and of its frames, taken with ``now()``.
+
+    The trial onset is the moment the first display update of the trial
+    returned, so reaction times are measured from when the display was
+    actually shown rather than from when run() started.
+
+    Every frame is one row of a preallocated array that holds the start of
+    the frame and the durations of its stages. Call ``start()`` at the top
+    of the frame and ``lap(stage)`` after each stage; a stage may be lapped
+    several times per frame (e.g. one hit test per event), its durations
+    add up. ``lap(FLIP)`` marks a display update. ``input(t)`` marks an
+    input event at time ``t`` that changed the display, and the next
+    ``lap(FLIP)`` records the time from that event to the flip, an estimate
+    of input-to-photon latency.
+
+    Parameters
+    ----------
+    frame_rate : float
+        Target frame rate in Hz.
+    capacity : int
+        Maximum number of frames recorded per trial. Later frames are
+        counted but not stored.
+    """
+
+    def __init__(self, frame_rate, capacity=10000):
+        self.frame_interval = 1 / frame_rate
+        self.start_time = now()
+        self.onset_time = None
+        # Start of the frame, then one column per stage. Frames beyond the
+        # capacity are timed into a spare last row.
+        self.frames = np.zeros((capacity + 1, 1 + len(STAGES)))
+        self.frame_count = 0
+        self.latencies = np.zeros(capacity)
+        self.latency_count = 0
+        self.pending_input = None
+        self._row = self.frames[0]
+        self._t = None
+
+    def start(self):
+        """Call at the top of every frame. Returns the start of the frame."""
+        t = now()
+        self._row = self.frames[min(self.frame_count, len(self.frames) - 1)]
+        self._row[:] = 0
+        self._row[0] = t
+        self.frame_count += 1
+        self._t = t
+        return t
+
+    def lap(self, stage):
+        """Call right after a stage of the frame loop."""
+        t = now()
+        self._row[1 + stage] += t - self._t
+        self._t = t
+        if stage == FLIP:
+            if self.onset_time is None:
+                self.onset_time = t
+            if self.pending_input is not None:
+                if self.latency_count < len(self.latencies):
+                    self.latencies[self.latency_count] = \
+                        t - self.pending_input
+                self.latency_count += 1
+                self.pending_input = None
+
+    def input(self, t):
+        if self.pending_input is None:
+            self.pending_input = t
+
+    def rt(self, t):
+        """Return the time since onset of timestamp ``t`` in ms."""
+        onset = self.start_time if self.onset_time is None \
+            else self.onset_time
+        return (t - onset) * 1000
+
+    def at(self, rt):
+        """Return the timestamp of a time since onset in ms, see rt()."""
+        onset = self.start_time if self.onset_time is None \
+            else self.onset_time
+        return onset + rt / 1000
+
+    def _recorded(self):
+        return self.frames[:min(self.frame_count, len(self.frames) - 1)]
+
+    def _intervals(self):
+        return np.diff(self._recorded()[:, 0]) * 1000
+
+    def summary(self):
+        """
+        Return the frame times (drawing and presenting), the onset delay
+        and the frame-interval statistics in ms. Jitter is the deviation of
+        the frame intervals from the target interval.
+        """
+        frames = self._recorded()
+        d = (frames[:, 1 + DRAW] + frames[:, 1 + FLIP]) * 1000
+        if not len(d):
+            d = np.zeros(1)
+        intervals = self._intervals()
+        if not len(intervals):
+            intervals = np.full(1, self.frame_interval * 1000)
+        deviation = np.abs(intervals - self.frame_interval * 1000)
+        onset = self.start_time if self.onset_time is None \
+            else self.onset_time
+        return {
+            'frame_count': self.frame_count,
+            'frame_time_mean': float(d.mean()),
+            'frame_time_median': float(np.median(d)),
+            'frame_time_p95': float(np.percentile(d, 95)),
+            'frame_time_max': float(d.max()),
+            'timing_onset_delay': (onset - self.start_time) * 1000,
+            'timing_frame_interval': float(intervals.mean()),
+            'timing_jitter_sd': float(intervals.std()),
+            'timing_jitter_max': float(deviation.max()),
+        }
+
+    def profile_summary(self):
+        """
+        Return p50, p95, p99 and max of every stage and of the
+        input-to-photon latency in ms, and the number of dropped frames,
+        frames that took more than 1.5 target intervals.
+        """
+        dropped = np.count_nonzero(
+            self._intervals() > 1.5 * self.frame_interval * 1000)
+        result = {'profile_dropped_frames': int(dropped)}
+        frames = self._recorded()
+        columns = [(name, frames[:, 1 + stage])
+                   for stage, name in enumerate(STAGES)]
+        columns.append(('input_to_photon', self.latencies[
+            :min(self.latency_count, len(self.latencies))]))
+        for name, d in columns:
+            d = d * 1000 if len(d) else np.zeros(1)
+            p50, p95, p99 = np.percentile(d, (50, 95, 99))
+            result.update({
+                'profile_%s_p50' % name: float(p50),
+                'profile_%s_p95' % name: float(p95),
+                'profile_%s_p99' % name: float(p99),
+                'profile_%s_max' % name: float(d.max()),
+            })
+        return result
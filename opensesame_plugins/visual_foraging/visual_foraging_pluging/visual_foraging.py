@@ -10,59 +10,108 @@ from openexp.canvas import Canvas
 from random import randint
 from qtpy import QtGui, QtCore, QtWidgets
 from .serialization_helpers import serialize_elements, deserialize_elements
-from .patch_helpers import get_element_instances
+from .patch_helpers import get_element_store
 from .element_list import ElementList
 from .background_picker import BackgroundPicker
 from .generator_selector import GeneratorSelector
 from .background_selector import BackgroundSelector
 from .location_selector import LocationSelector
-from .input_helpers import get_click
+from .layout_preview import LayoutPreview
+from .input_helpers import EventPump, CLICK_ACTIONS, DOWN, DOUBLE_CLICK, MOTION
+from .spatial_helpers import SpatialIndex
+from .completion_helpers import CompletionTracker
+from .render_helpers import get_renderer, NullRenderer
+from .image_cache import image_cache
+from .timing_helpers import TrialTiming, POLL, HIT_TEST, DRAW, FLIP
+from .event_log import EventLog, ON_DOUBLE_CLICK
+from .look_ahead import TrialSettings, LookAhead, prepare_trial
+from .background_helpers import parse_background, background_layer
+from .sound_helpers import sound_bank
+from .replay import ReplayPump, count_mismatches
+import os
+import warnings
+import numpy as np
 import pygame
-from numpy import array
-from numpy.linalg import norm
 
 class VisualForaging(Item):
     
     loaded_images = {}
+    background_surface = None
     element_instances = {}
+    spatial_index = None
+    completion = None
+    renderer = None
+    action_masks = {}
+    event_log = None
+    look_ahead = None
+    click_sounds = []
+    play_sounds = True
+    timing = None
+    replay_log = None
+    trial = 0
+    layout_hash = ''
+    debug = False
     click_radius = 32 # Make control
     screen = None
     mouse = None
     
-    def check_clicked(self, click_pos, time):
+    def check_clicked(self, click_pos, time, kind=DOWN):
         click_pos = (click_pos[0], click_pos[1])
-        #clicks.append({'position' : click_pos, 'time_stamp': time})
-        print(click_pos)
-        for ei in self.element_instances:
-            element_pos = array([ei['x'], ei['y']])
-            click_pos = array(click_pos)
-            ei['dist_to_click'] = norm(element_pos-click_pos) 
-        closest_element = self.element_instances[0]
-        for ei in self.element_instances:
-            if ei['dist_to_click'] < closest_element['dist_to_click']:
-                closest_element = ei	  
-        if closest_element['dist_to_click'] > self.click_radius:
+        if self.debug:
+            print(click_pos)
+        i = self.spatial_index.nearest(click_pos[0], click_pos[1],
+                                       self.click_radius,
+                                       accept=self.action_masks.get(kind))
+        if i is None:
+            # Mouse movement that hits nothing is not worth logging
+            if kind == MOTION:
+                return
+            # The clicks of a double click are not misses
+            if kind == DOWN and self.spatial_index.nearest(
+                    click_pos[0], click_pos[1], self.click_radius,
+                    accept=self.action_masks[DOUBLE_CLICK]) is not None:
+                self.event_log.record(time, click_pos[0], click_pos[1], kind,
+                                      ON_DOUBLE_CLICK)
+            else:
+                self.event_log.record(time, click_pos[0], click_pos[1], kind)
             return
-        # TODO: play sounds, etc
-        print(closest_element)
-        if closest_element in self.element_instances:
-            self.element_instances.remove(closest_element)
+        self.event_log.record(time, click_pos[0], click_pos[1], kind, i)
+        sound = self.click_sounds[self.element_instances.codes['click_sound'][i]]
+        if sound is not None and self.play_sounds:
+            sound_bank.play(sound, self.timing.at(time))
+        if self.debug:
+            print(self.element_instances[i])
+        # Shared with the spatial index, so this removes it there as well
+        self.element_instances.remove(i)
+        self.completion.collect(i)
+        self.renderer.vanish(i)
+        return i
     
     def check_complete(self):
-        for ei in self.element_instances:
-            if ei['role'] == 'target':
-                return False
-        return True
+        return self.completion.complete()
   
 
     def reset(self):
         """Resets plug-in to initial values."""
         self.var.show_mousepointer = 'yes'
+        self.var.stop_rule = ''
+        self.var.render_mode = 'full redraw'
+        self.var.image_cache_mb = 256
+        self.var.frame_rate = 60
+        self.var.layout_seed = ''
+        self.var.layout_bank = ''
+        self.var.event_log_folder = ''
+        self.var.replay_folder = ''
+        self.var.replay_realtime = 'no'
+        self.var.profile = 'no'
+        self.var.look_ahead = 'no'
+        self.var.debug = 'no'
 
 
     def prepare(self):
         """The preparation phase of the plug-in goes here."""
         super().prepare()
+        self.debug = self.var.get('debug', 'no') == 'yes'
         
         if self.screen is None:
             if self.var.fullscreen == 'yes':
@@ -72,42 +121,200 @@ class VisualForaging(Item):
             
         pygame.mouse.set_visible(self.var.show_mousepointer == 'yes')
         
-        element_types = deserialize_elements(getattr(self.var, "elements", None))
-        self.element_instances = get_element_instances(element_types)  
+        # Composited once and restored from on every frame
+        color, image = parse_background(self.var.get('background', ''))
+        self.background_surface = background_layer(
+            self.screen.get_size(), color,
+            self.experiment.pool[image] if image else None
+        )
+        
+        # Parsing, image decoding and the layout may have been done during
+        # the previous trial
+        self.trial = self.var.get('count_%s' % self.name, 0)
+        settings = self.trial_settings(self.trial)
+        prepared = None
+        if self.look_ahead is not None:
+            prepared = self.look_ahead.take(settings)
+        if prepared is None:
+            prepared = prepare_trial(settings, self.experiment.pool)
+        element_types = prepared.element_types
+        positions = prepared.positions
+        self.layout_hash = prepared.layout_hash
+        self.replay_log = prepared.replay_log
         
-        # Load images
+        # Converted to the display format here, on the main thread, and
+        # shared across trials
+        image_cache.budget = int(self.var.get('image_cache_mb', 256)) * 2 ** 20
         self.loaded_images = {
-            el["image"]: pygame.image.load(self.experiment.pool[el["image"]]) for el in element_types
+            name: image_cache.get(path, surface)
+            for name, (path, surface) in prepared.images.items()
         }
         
-        print("POSITIONS: " + str(self.var.location_settings))
+        self.element_instances = get_element_store(element_types, positions)  
+        self.spatial_index = SpatialIndex(
+            self.element_instances.x,
+            self.element_instances.y,
+            self.click_radius,
+            alive=self.element_instances.alive
+        )
+        self.completion = CompletionTracker(
+            self.element_instances, str(self.var.get('stop_rule', ''))
+        )
+        
+        # Sounds are decoded here, so the frame loop only starts playback.
+        # The mixer is the experiment's, set up from its sound settings.
+        sound_names = self.element_instances.strings.get('click_sound', [])
+        self.click_sounds = [None] * len(sound_names)
+        if any(sound_names) and sound_bank.init(
+                frequency=int(self.var.get('sound_freq', 48000)),
+                size=int(self.var.get('sound_sample_size', -16)),
+                channels=int(self.var.get('sound_channels', 2)),
+                buffer=int(self.var.get('sound_buf_size', 1024))):
+            self.click_sounds = [
+                sound_bank.load(self.experiment.pool[name]) if name else None
+                for name in sound_names
+            ]
+        
+        # Which elements respond to which kind of input event
+        self.action_masks = {
+            kind: self.element_instances.matches('click_action', [action])
+            for action, kind in CLICK_ACTIONS.items()
+        }
+        
+        # The log's buffers are allocated once and reused by every trial
+        if self.event_log is None:
+            self.event_log = EventLog()
+        self.event_log.clear()
+        
+        if self.var.get('look_ahead', 'no') == 'yes':
+            if self.look_ahead is None:
+                self.look_ahead = LookAhead()
+            self.look_ahead.submit(self.trial_settings(self.trial + 1),
+                                   self.experiment.pool)
+        
+        if self.debug:
+            print("POSITIONS: " + str(self.var.get('location_settings', '')))
+            print("BACKGROUND: %s, %s" % (color, image))
        
 
     def run(self):
         """The run phase of the plug-in goes here."""
         
         trial_start_time = self.clock.time()
+        store = self.element_instances
+        realtime = self.var.get('replay_realtime', 'no') == 'yes'
+        # Replays that are not in real time are neither shown nor heard
+        show = self.replay_log is None or realtime
+        if show:
+            self.renderer = get_renderer(
+                self.var.get('render_mode', 'full redraw'),
+                self.screen,
+                self.background_surface,
+                [self.loaded_images[name] for name in store.strings.get('image', [])],
+                store,
+                self.spatial_index
+            )
+        else:
+            self.renderer = NullRenderer()
+        frame_rate = int(self.var.get('frame_rate', 60))
+        timing = self.timing = TrialTiming(frame_rate)
+        # Motion only needs hit-testing if some element reacts to mouse over,
+        # and then at every position, so that fast movements that cross an
+        # element within a frame collect it
+        hover = self.action_masks[MOTION].any()
+        if self.replay_log is not None:
+            pump = ReplayPump(self.replay_log, timing, realtime)
+        else:
+            pump = EventPump(coalesce_motion=not hover)
+        self.play_sounds = show
+        sound_bank.reset_stats()
         while not self.check_complete():
-            print("COLOR: " + self.var.background['color'])
-            self.screen.fill(pygame.Color(self.var.background))
-            for ei in self.element_instances:
-                img = self.loaded_images[ei['image']]
-                self.screen.blit(img,
-                    (int(ei['x'] - img.get_width() / 2),
-                     int(ei['y'] - img.get_height() / 2))
-                )
-            pygame.display.flip()
-            
-            
-            #button, pos, time = pygame.mouse.get_click()
+            frame_start = timing.start()
+            events = pump.poll()
+            timing.lap(POLL)
+            for event in events:
+                if event.kind in (DOWN, DOUBLE_CLICK) or \
+                        (event.kind == MOTION and hover):
+                    if self.check_clicked((event.x, event.y),
+                                          timing.rt(event.time),
+                                          event.kind) is not None:
+                        timing.input(event.time)
+                        # Input after the click that ends the trial is
+                        # ignored, as by the stop rule
+                        if self.check_complete():
+                            break
+            timing.lap(HIT_TEST)
             
-            
-            
-            click_info = get_click()
-            
-            if click_info:
-                # TODO: why not keep the dict and use it in check_clicked
-                self.check_clicked((click_info['x'], click_info['y']), click_info['rt'])
+            update = self.renderer.render()
+            timing.lap(DRAW)
+            if update is not None:
+                self.renderer.present(update)
+                timing.lap(FLIP)
+            if self.replay_log is not None and pump.exhausted:
+                break
+            # Events that arrive until the next frame are stamped on arrival
+            pump.wait(frame_start + timing.frame_interval)
+        
+        self.experiment.var.targets_left = self.completion.targets_left
+        self.experiment.var.collected = self.completion.collected
+        self.experiment.var.value_sum = self.completion.value_sum
+        self.experiment.var.image_cache_hits = image_cache.hits
+        self.experiment.var.image_cache_misses = image_cache.misses
+        for name, value in timing.summary().items():
+            self.experiment.var.set(name, value)
+        if self.var.get('profile', 'no') == 'yes':
+            for name, value in timing.profile_summary().items():
+                self.experiment.var.set(name, value)
+        if any(sound is not None for sound in self.click_sounds):
+            for name, value in sound_bank.summary().items():
+                self.experiment.var.set(name, value)
+        for name, value in self.event_log.summary(self.element_instances).items():
+            self.experiment.var.set(name, value)
+        if self.replay_log is not None:
+            mismatches = count_mismatches(self.replay_log,
+                                          self.event_log.columns())
+            self.experiment.var.replay_mismatches = mismatches
+            if mismatches:
+                warnings.warn("Replay of trial %s of %s differs from the "
+                              "recording in %d events"
+                              % (self.trial, self.name, mismatches))
+        elif self.var.get('event_log_folder', ''):
+            self.event_log.save(
+                self.log_path(self.var.event_log_folder),
+                positions=np.column_stack((store.x, store.y)),
+                layout_hash=self.layout_hash,
+                trial=self.trial
+            )
+
+    def log_path(self, folder, trial=None):
+        """
+        Return the event log file of a trial, by default the current one,
+        in folder. Files are named after the item, the subject number and
+        the trial, so sessions of different subjects can share a folder.
+        Relative folders are taken relative to the folder of the experiment
+        (experiment_path).
+        """
+        folder = os.path.join(
+            getattr(self.experiment, 'experiment_path', '') or '', str(folder))
+        if trial is None:
+            trial = self.trial
+        return os.path.join(folder, '%s_%s_%s.npz' % (
+            self.name, self.var.get('subject_nr', 0), trial))
+    
+    def trial_settings(self, trial):
+        """Return the TrialSettings of a trial of this item."""
+        return TrialSettings(
+            elements=str(self.var.get('elements', '')),
+            location_settings=str(self.var.get('location_settings', '')),
+            width=int(self.var.width),
+            height=int(self.var.height),
+            seed=str(self.var.get('layout_seed', '')),
+            trial=trial,
+            layout_bank=self.experiment.pool[self.var.layout_bank]
+            if self.var.get('layout_bank', '') else '',
+            replay_log=self.log_path(self.var.replay_folder, trial)
+            if self.var.get('replay_folder', '') else ''
+        )
 
 
 
@@ -127,6 +334,15 @@ class QtVisualForaging(VisualForaging, QtAutoPlugin):
         )
         index = self.edit_vbox.count() - 2
         self.edit_vbox.insertWidget(index, self.location_selector)
+
+        # --- Layout preview -------------------------------------------------------
+        self.layout_preview = LayoutPreview(plugin=self)
+        self.location_selector.edited.connect(
+                lambda txt: self.layout_preview.update_layout(
+                    location_settings=txt)
+        )
+        index = self.edit_vbox.count() - 2
+        self.edit_vbox.insertWidget(index, self.layout_preview)
         
         bg = BackgroundSelector(main_window=self.main_window, plugin=self)
         self.auto_line_edit['background'] = bg
@@ -146,6 +362,18 @@ class QtVisualForaging(VisualForaging, QtAutoPlugin):
         
 
         self.auto_line_edit['elements'] = cl
+        cl.textChanged.connect(
+                lambda txt: self.layout_preview.update_layout(elements=txt)
+        )
+
+    def edit_widget(self):
+        super().edit_widget()
+        # Not an auto widget, so the script is loaded here
+        self.location_selector.setText(self.var.get('location_settings', ''))
+        # The script may have changed anything the layout depends on
+        self.layout_preview.update_layout(
+            elements=self.var.get('elements', ''),
+            location_settings=self.var.get('location_settings', ''))
         
         
         
@@ -0,0 +1,17 @@
+"""
+Round trip of the angle-brace element format.
+"""
+
+import random
+
+from benchmarks.bench_serialization import random_element
+from opensesame_plugins.visual_foraging.visual_foraging_pluging.serialization_helpers import serialize_elements, deserialize_elements
+
+
+def test_round_trip():
+    # Strings contain braces, angle braces, quotes, backslashes and
+    # non-ASCII characters
+    rng = random.Random(0)
+    for _ in range(500):
+        elements = [random_element(rng) for _ in range(rng.randrange(2, 6))]
+        assert deserialize_elements(serialize_elements(elements)) == elements